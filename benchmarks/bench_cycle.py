@@ -0,0 +1,135 @@
+"""Benchmark satu cycle penuh terhadap mock server lokal: makespan, request per wallet, peak RSS.
+
+    python benchmarks/bench_cycle.py --sizes 10,100,1000,10000 --engine async --concurrency 50
+    python benchmarks/bench_cycle.py --sizes 10,100 --engine sync --latency 0.005 --fail429 0.02
+
+Tiap ukuran fleet jalan di subprocess sendiri (peak RSS per fleet). Di subprocess itu
+bot.pacing diset ke --sleep-scale: delay antar wallet, backoff, retry, dan wallet yang
+di-park di BackoffScheduler (termasuk wait_for engine async) hanya ditunggu sebagian,
+sedangkan latency mock server tetap real. time.sleep/asyncio.sleep milik run.py dibungkus
+fake clock yang menghitung delay asli yang dilewati.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from mock_server import MockPipWorld
+
+PROBE = r"""
+import asyncio, json, resource, sys, time, types
+sys.path.insert(0, {repo!r})
+import run
+
+class FakeClock:
+    def __init__(self, scale):
+        self.scale = scale
+        self.requested = 0.0
+        self.calls = 0
+    
+    def count(self, seconds):
+        # delay sudah dikali bot.pacing, jadi dibagi balik untuk delay aslinya
+        seconds = max(0.0, seconds)
+        self.requested += seconds / self.scale if self.scale else 0.0
+        self.calls += 1
+        return seconds
+    
+    def sleep(self, seconds):
+        time.sleep(self.count(seconds))
+    
+    async def async_sleep(self, seconds, result=None):
+        return await asyncio.sleep(self.count(seconds), result)
+
+clock = FakeClock({sleep_scale!r})
+run.time = types.SimpleNamespace(**{{**vars(time), 'sleep': clock.sleep}})
+run.asyncio = types.SimpleNamespace(**{{**vars(asyncio), 'sleep': clock.async_sleep}})
+run.PRIVY_BASE_URL = run.API_BASE_URL = {base_url!r}
+
+bot = run.PipWorldAutoTask(use_async={use_async!r}, concurrency={concurrency!r}, host_rates={{}}, log_level='error')
+bot.logger.stream = open('bench.log', 'w')
+bot.pacing = clock.scale
+bot.load_wallets_and_proxies()
+bot.journal.begin(1)
+started = time.perf_counter()
+if bot.use_async:
+    asyncio.run(bot.run_cycle_async())
+else:
+    bot.run_cycle()
+makespan = time.perf_counter() - started
+bot.state_store.flush()
+requests = sum(value for (name, _), value in bot.metrics.counters.items() if name == 'pipworld_http_requests_total')
+print(json.dumps({{
+    'wallets': len(bot.wallets),
+    'makespan_s': makespan,
+    'requests': requests,
+    'daily': bot.journal.daily_success(bot.wallets),
+    'failed': bot.cycle_stats['failed'],
+    'skipped_sleep_s': clock.requested,
+    'sleep_calls': clock.calls,
+    'cpu_s': sum(resource.getrusage(resource.RUSAGE_SELF)[:2]),
+    'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+def write_wallets(path: str, count: int):
+    """Wallet sintetis deterministik; mock server tidak memverifikasi signature"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            private_key = hashlib.sha256(f"bench-wallet-{i}".encode()).hexdigest()
+            address = '0x' + hashlib.sha256(private_key.encode()).hexdigest()[:40]
+            f.write(f"{address},{private_key}\n")
+
+def probe(size: int, engine: str, args, base_url: str) -> dict:
+    code = PROBE.format(repo=REPO, base_url=base_url, use_async=engine == 'async', concurrency=args.concurrency, sleep_scale=args.sleep_scale)
+    with tempfile.TemporaryDirectory() as workdir:
+        write_wallets(os.path.join(workdir, 'wallets.txt'), size)
+        out = subprocess.run([sys.executable, '-c', code], cwd=workdir, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"probe failed for {size} wallets:\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000', help="ukuran fleet, pisahkan dengan koma (10 sampai 10000)")
+    parser.add_argument('--engine', choices=('async', 'sync', 'both'), default='async')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.02, help="latency mock server per request (detik)")
+    parser.add_argument('--fail429', type=float, default=0.0)
+    parser.add_argument('--fail5xx', type=float, default=0.0)
+    parser.add_argument('--tasks', type=int, default=3)
+    parser.add_argument('--retry-after', type=float, default=1)
+    parser.add_argument('--sleep-scale', type=float, default=0.001, help="fraksi delay run.py yang benar-benar ditidurkan")
+    parser.add_argument('--json', action='store_true', help="output satu JSON per baris")
+    args = parser.parse_args()
+    mock = MockPipWorld(args.latency, args.fail429, args.fail5xx, args.tasks, args.retry_after)
+    base_url = mock.start()
+    engines = ('async', 'sync') if args.engine == 'both' else (args.engine,)
+    if not args.json:
+        print(f"mock {base_url}: latency {args.latency * 1000:.0f}ms, 429 {args.fail429:.1%}, 5xx {args.fail5xx:.1%}, {args.tasks} tasks")
+        print(f"{'engine':<7} {'wallets':>7} {'makespan':>10} {'wallet/s':>9} {'req/wallet':>10} {'injected':>8} {'daily':>7} {'cpu':>8} {'peak RSS':>9}")
+    try:
+        for engine in engines:
+            for size in (int(value) for value in args.sizes.split(',')):
+                mock.reset()
+                result = probe(size, engine, args, base_url)
+                result.update(engine=engine, server_requests=mock.requests, injected=mock.injected)
+                if args.json:
+                    print(json.dumps(result), flush=True)
+                    continue
+                print(
+                    f"{engine:<7} {size:>7} {result['makespan_s']:>9.2f}s {size / result['makespan_s']:>9.1f} "
+                    f"{mock.requests / size:>10.2f} {mock.injected:>8} {result['daily']:>7} {result['cpu_s']:>7.1f}s {result['maxrss_mb']:>7.1f}MB",
+                    flush=True
+                )
+    finally:
+        mock.stop()
+
+if __name__ == "__main__":
+    main()
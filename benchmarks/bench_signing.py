@@ -0,0 +1,66 @@
+"""Microbenchmark sign_message: Web3() per call (lama) vs SignerCache (baru).
+
+    python benchmarks/bench_signing.py --wallets 50 --rounds 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+from run import SignerCache
+
+MESSAGE = "mm.pip.world wants you to sign in with your Ethereum account:\n{address}\n\nNonce: {nonce}"
+
+def sign_legacy(private_key: str, message: str) -> str:
+    from web3 import Web3
+    w3 = Web3()
+    if not private_key.startswith('0x'):
+        private_key = '0x' + private_key
+    signed = w3.eth.account.sign_message(encode_defunct(text=message), private_key=private_key)
+    return "0x" + signed.signature.hex()
+
+def sign_cached(signers: SignerCache, private_key: str, message: str) -> str:
+    signed = signers.get(private_key).sign_message(encode_defunct(text=message))
+    return "0x" + signed.signature.hex()
+
+def measure(label: str, sign, keys, rounds: int) -> float:
+    started = time.perf_counter()
+    for i in range(rounds):
+        private_key, address = keys[i % len(keys)]
+        sign(private_key, MESSAGE.format(address=address, nonce=i))
+    elapsed = time.perf_counter() - started
+    rate = rounds / elapsed
+    print(f"{label:<28} {rounds} signatures in {elapsed:.3f}s -> {rate:,.0f} sig/s")
+    return rate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wallets', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    keys = []
+    for _ in range(args.wallets):
+        account = Account.create()
+        keys.append((account.key.hex().removeprefix('0x'), account.address))
+    signers = SignerCache()
+    started = time.perf_counter()
+    for private_key, _ in keys:
+        signers.preload(private_key)
+    print(f"preload {len(keys)} keys: {(time.perf_counter() - started) * 1000:.1f}ms")
+    after = measure("cached signer (eth_account)", lambda k, m: sign_cached(signers, k, m), keys, args.rounds)
+    try:
+        sample_key, sample_address = keys[0]
+        sample = MESSAGE.format(address=sample_address, nonce=0)
+        assert sign_cached(signers, sample_key, sample) == sign_legacy(sample_key, sample)
+        before = measure("Web3() per call", sign_legacy, keys, args.rounds)
+        print(f"speedup: {after / before:.2f}x")
+    except ImportError:
+        print("web3 not installed, skipping legacy baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark startup: waktu import run.py, RSS, dan modul berat yang ikut ter-load.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('web3', 'eth_account', 'eth_keys', 'aiohttp', 'requests')
+
+PROBE = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import run
+imported = time.perf_counter()
+bot = run.PipWorldAutoTask()
+ready = time.perf_counter()
+{extra}
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'ready_ms': (ready - started) * 1000,
+    'done_ms': (time.perf_counter() - started) * 1000,
+    'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+SIGN_FIRST = r"""
+bot.sign_message('0x' + '11' * 32, 'hello')
+"""
+
+def probe(extra: str, workdir: str) -> dict:
+    code = PROBE.format(repo=REPO, extra=extra, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', code], cwd=workdir, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def report(label: str, samples: list):
+    def median(key):
+        values = sorted(sample[key] for sample in samples)
+        return values[len(values) // 2]
+    print(f"{label}:")
+    print(f"  import run      {median('import_ms'):8.1f} ms")
+    print(f"  bot ready       {median('ready_ms'):8.1f} ms")
+    print(f"  done            {median('done_ms'):8.1f} ms")
+    print(f"  peak RSS        {median('maxrss_mb'):8.1f} MB")
+    print(f"  heavy modules   {', '.join(samples[-1]['heavy']) or '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        report("startup (no signing)", [probe('', workdir) for _ in range(args.runs)])
+        report("startup + first signature", [probe(SIGN_FIRST, workdir) for _ in range(args.runs)])
+
+if __name__ == "__main__":
+    main()
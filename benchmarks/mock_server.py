@@ -0,0 +1,125 @@
+"""Server lokal pengganti Privy dan api-mm.pip.world untuk benchmark offline.
+
+    python benchmarks/mock_server.py --port 8080 --latency 0.02 --fail429 0.01
+    PIPWORLD_PRIVY_URL=http://127.0.0.1:8080 PIPWORLD_API_URL=http://127.0.0.1:8080 python run.py
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DAILY_TASK_ID = "h8i9j0k1-l2m3-n4o5-p6q7-r8s9t0u1v2w3"
+
+class MockPipWorld:
+    """Endpoint SIWE, /account, /xp-tasks dan /xp/tasks/{id} dengan latency dan error injection"""
+    def __init__(self, latency: float = 0.02, fail429: float = 0.0, fail5xx: float = 0.0, tasks: int = 3, retry_after: float = 1):
+        self.latency = latency
+        self.fail429 = fail429
+        self.fail5xx = fail5xx
+        self.retry_after = retry_after
+        self.task_list = [{'id': DAILY_TASK_ID, 'name': 'Daily check-in', 'xp': 10, 'done': False}]
+        for i in range(1, tasks):
+            self.task_list.append({'id': f"{i:08x}-0000-4000-8000-{i:012x}", 'name': f"Task {i}", 'xp': 5, 'done': False})
+        self.task_etag = '"' + hashlib.sha1(json.dumps(self.task_list).encode()).hexdigest()[:16] + '"'
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.injected = 0
+        self.server = None
+    
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.injected = 0
+    
+    def make_token(self) -> str:
+        payload = json.dumps({'exp': int(time.time()) + 3600, 'sub': 'did:privy:mock'}).encode()
+        return 'eyJhbGciOiJFUzI1NiJ9.' + base64.urlsafe_b64encode(payload).rstrip(b'=').decode() + '.mock'
+    
+    def route(self, method: str, path: str, if_none_match: str = None) -> tuple:
+        """Returns (status, body, headers); body None berarti tanpa body (304)"""
+        if random.random() < self.fail429:
+            return 429, {'error': 'rate limited'}, {'Retry-After': f"{self.retry_after:g}"}
+        if random.random() < self.fail5xx:
+            return 503, {'error': 'unavailable'}, {}
+        if path.endswith('/siwe/init'):
+            return 200, {'nonce': f"{random.getrandbits(64):016x}", 'expires_at': '2099-01-01T00:00:00Z'}, {}
+        if path.endswith('/siwe/authenticate'):
+            return 200, {'token': self.make_token(), 'user': {'id': 'did:privy:mock'}}, {}
+        if path.endswith('/account'):
+            return 200, {'ok': True}, {}
+        if path.endswith('/xp-tasks'):
+            if if_none_match == self.task_etag:
+                return 304, None, {'ETag': self.task_etag}
+            return 200, self.task_list, {'ETag': self.task_etag}
+        if '/xp/tasks/' in path and method == 'POST':
+            return 200, {'success': True, 'xp': 10}, {}
+        return 404, {'error': 'not found'}, {}
+    
+    def handler(self):
+        mock = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def handle_request(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if mock.latency:
+                    time.sleep(mock.latency)
+                status, body, headers = mock.route(self.command, self.path.split('?')[0], self.headers.get('If-None-Match'))
+                with mock.lock:
+                    mock.requests += 1
+                    if status in (429, 503):
+                        mock.injected += 1
+                payload = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            do_GET = handle_request
+            do_POST = handle_request
+            
+            def log_message(self, format, *args):
+                pass
+        return Handler
+    
+    def start(self, port: int = 0, host: str = '127.0.0.1') -> str:
+        ThreadingHTTPServer.request_queue_size = 1024
+        self.server = ThreadingHTTPServer((host, port), self.handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='mock-pipworld', daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+    
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.02, help="detik per request")
+    parser.add_argument('--fail429', type=float, default=0.0, help="fraksi request yang dijawab 429")
+    parser.add_argument('--fail5xx', type=float, default=0.0, help="fraksi request yang dijawab 503")
+    parser.add_argument('--tasks', type=int, default=3, help="jumlah task di /xp-tasks (termasuk daily check-in)")
+    parser.add_argument('--retry-after', type=float, default=1)
+    args = parser.parse_args()
+    mock = MockPipWorld(args.latency, args.fail429, args.fail5xx, args.tasks, args.retry_after)
+    print(f"Mock server listening on {mock.start(args.port)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,311 @@ import requests
 import json
 import time
 import random
-from web3 import Web3
-from eth_account.messages import encode_defunct
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Iterator, Optional, List, Tuple
 from datetime import datetime, timedelta
 import os
 import sys
 import pickle
 import hashlib
+import base64
 from urllib.parse import urlparse
 import threading
+import email.utils
+import weakref
+import http.cookiejar
+from collections import Counter, OrderedDict, deque
+import heapq
+import itertools
+import sqlite3
+import atexit
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import signal
+import multiprocessing
+import queue
+import http.server
+import functools
+import struct
+import gzip
+import importlib.util
+import re
+import cProfile
+import pstats
+import tracemalloc
+import contextlib
+
+aiohttp = None
+ProxyConnector = None
+Account = None
+encode_defunct = None
+
+def load_async_deps():
+    """Import aiohttp (dan aiohttp-socks jika ada) saat mode async pertama kali dipakai"""
+    global aiohttp, ProxyConnector
+    if aiohttp is None:
+        import aiohttp as aiohttp_module
+        try:
+            from aiohttp_socks import ProxyConnector as socks_connector
+        except ImportError:
+            socks_connector = None
+        aiohttp, ProxyConnector = aiohttp_module, socks_connector
+    return aiohttp
+
+def load_signing_deps():
+    """Import eth_account saat signing pertama dibutuhkan"""
+    global Account, encode_defunct
+    if Account is None:
+        from eth_account import Account as account_class
+        from eth_account.messages import encode_defunct as encode
+        Account, encode_defunct = account_class, encode
+    return Account
+
+DEFAULT_SESSION_HEADERS = {
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-site',
+}
+
+PRIVY_BASE_URL = os.environ.get('PIPWORLD_PRIVY_URL', 'https://privy.pip.world')
+API_BASE_URL = os.environ.get('PIPWORLD_API_URL', 'https://api-mm.pip.world')
+
+PRIVY_HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+    'Origin': 'https://mm.pip.world',
+    'Referer': 'https://mm.pip.world/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'privy-app-id': 'cmd5wk49c01qejr0m6tun1ri5',
+    'privy-ca-id': '57e973d5-e48f-4e5f-9f26-0576573aa378',
+    'privy-client': 'react-auth:2.13.7'
+}
+
+LOGIN_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/537.36'
+]
+
+class Logger:
+    """Logger non-blocking: caller hanya enqueue, format dan write dikerjakan thread background"""
+    LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+    COLORS = {
+        "red": "\033[91m",
+        "green": "\033[92m",
+        "yellow": "\033[93m",
+        "blue": "\033[94m",
+        "purple": "\033[95m",
+        "cyan": "\033[96m",
+        "white": "\033[97m",
+    }
+    
+    def __init__(self, level: str = 'info', json_stream: bool = False, json_path: Optional[str] = None, stream=None, max_backlog: int = 10000):
+        self.stream = stream or sys.stdout
+        self.level = self.LEVELS[level]
+        self.json_stream = json_stream
+        self.color = not json_stream and self.stream.isatty()
+        self.json_file = open(json_path, 'a', encoding='utf-8') if json_path else None
+        self.max_backlog = max_backlog
+        self.context = {}
+        self.queue = queue.SimpleQueue()
+        self.dropped = 0
+        self.reported_drops = 0
+        self.closed = False
+        self.writer = threading.Thread(target=self._writer_loop, name='log-writer', daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+    
+    def log(self, level: str, message: str, color: Optional[str] = None):
+        """Enqueue satu pesan; debug/info dibuang kalau backlog penuh, warning/error selalu masuk"""
+        if self.LEVELS[level] < self.level:
+            return
+        if level in ('debug', 'info') and self.queue.qsize() >= self.max_backlog:
+            self.dropped += 1
+            return
+        self.queue.put((time.time(), level, message, color, None))
+    
+    def event(self, event: str, **fields):
+        self.queue.put((time.time(), 'info', None, None, dict(event=event, **fields)))
+    
+    def flush(self, timeout: float = 2.0):
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+    
+    def format_json(self, ts: float, level: str, message: Optional[str], fields: Optional[Dict]) -> Optional[str]:
+        record = {'time': datetime.fromtimestamp(ts).isoformat(timespec='seconds')}
+        if fields is None:
+            message = message.strip()
+            if not message.strip('='):
+                return None
+            record.update(event='log', level=level, message=message)
+        else:
+            record.update(fields)
+        record.update(self.context)
+        return json.dumps(record, default=str)
+    
+    def format_text(self, ts: float, message: Optional[str], color: Optional[str], fields: Optional[Dict]) -> str:
+        if fields is not None:
+            details = ', '.join(f"{key}={value}" for key, value in fields.items() if key != 'event')
+            message = f"{fields['event']}: {details}"
+        line = f"[{datetime.fromtimestamp(ts).strftime('%H:%M:%S')}] {message}"
+        if self.color:
+            return f"{self.COLORS.get(color, self.COLORS['white'])}{line}\033[0m"
+        return line
+    
+    def write_batch(self, batch: List):
+        lines = []
+        json_lines = []
+        if self.dropped != self.reported_drops:
+            batch.append((time.time(), 'warning', f"{self.dropped - self.reported_drops} log messages dropped (backlog full)", 'yellow', None))
+            self.reported_drops = self.dropped
+        for ts, level, message, color, fields in batch:
+            if self.json_stream or self.json_file:
+                json_line = self.format_json(ts, level, message, fields)
+                if json_line is not None:
+                    json_lines.append(json_line)
+            if not self.json_stream:
+                lines.append(self.format_text(ts, message, color, fields))
+        try:
+            output = json_lines if self.json_stream else lines
+            if output:
+                self.stream.write('\n'.join(output) + '\n')
+                self.stream.flush()
+            if self.json_file and json_lines:
+                self.json_file.write('\n'.join(json_lines) + '\n')
+                self.json_file.flush()
+        except (OSError, ValueError):
+            pass
+    
+    def _writer_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < 1000:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            records = [item for item in batch if isinstance(item, tuple)]
+            if records:
+                self.write_batch(records)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.writer.join(timeout=5)
+        if self.json_file:
+            self.json_file.close()
+
+class StateStore:
+    """Penyimpanan state SQLite (WAL) dengan group commit di background"""
+    def __init__(self, path: str = 'pipworld.db', flush_interval: float = 0.5, batch_size: int = 500, logger: Optional['Logger'] = None):
+        self.path = path
+        self.persistent = path != ':memory:'
+        self.logger = logger
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.db_lock = threading.RLock()
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.commits = 0
+        self.closed = False
+        self.writer = threading.Thread(target=self._writer_loop, name='state-writer', daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+    
+    def log(self, level: str, message: str):
+        """Pesan loader/store lewat Logger bot (JSON di --daemon); tanpa logger ke stderr"""
+        if self.logger:
+            self.logger.log(level, message, 'red' if level == 'error' else 'cyan')
+        else:
+            print(message, file=sys.stderr)
+    
+    def ensure_schema(self, *statements: str):
+        with self.db_lock:
+            for statement in statements:
+                self.conn.execute(statement)
+    
+    def query(self, sql: str, params=()) -> List[Tuple]:
+        with self.db_lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def write(self, sql: str, params=(), key=None):
+        """Antrikan write; write dengan key yang sama di batch yang sama digabung"""
+        with self.cond:
+            if key is None:
+                key = object()
+            self.pending.pop(key, None)
+            self.pending[key] = (sql, params)
+            if len(self.pending) == 1 or len(self.pending) >= self.batch_size:
+                self.cond.notify()
+    
+    def flush(self):
+        with self.db_lock:
+            with self.cond:
+                batch, self.pending = list(self.pending.values()), {}
+            if not batch:
+                return
+            try:
+                self.conn.execute('BEGIN')
+                for sql, params in batch:
+                    self.conn.execute(sql, params)
+                self.conn.execute('COMMIT')
+                self.commits += 1
+            except Exception as e:
+                try:
+                    if self.conn.in_transaction:
+                        self.conn.execute('ROLLBACK')
+                except sqlite3.Error:
+                    pass
+                self.log('error', f"Error writing state: {e}")
+    
+    def _writer_loop(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.closed and len(self.pending) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+                closed = self.closed
+            self.flush()
+            if closed:
+                return
+    
+    def close(self):
+        if self.closed:
+            return
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.writer.join(timeout=5)
+        self.flush()
+        with self.db_lock:
+            self.conn.close()
 
 class SessionManager:
     """Manajer session yang lebih cerdas"""
-    def __init__(self):
-        self.sessions_file = 'sessions.dat'
+    def __init__(self, store: Optional[StateStore] = None):
+        self.legacy_sessions_file = 'sessions.dat'
+        self.store = store or StateStore()
         self.sessions = {}
         self.lock = threading.Lock()
+        self.store.ensure_schema('CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, data TEXT NOT NULL)')
         self.load_sessions()
     
     def get_session_key(self, address: str) -> str:
@@ -26,658 +314,2982 @@ class SessionManager:
     
     def load_sessions(self):
         try:
-            if os.path.exists(self.sessions_file):
-                with open(self.sessions_file, 'rb') as f:
-                    self.sessions = pickle.load(f)
-                print(f"Loaded {len(self.sessions)} saved sessions")
+            if self.store.persistent and os.path.exists(self.legacy_sessions_file):
+                self.migrate_legacy_sessions()
+            count = self.store.query('SELECT COUNT(*) FROM sessions')[0][0]
+            if count:
+                self.store.log('info', f"Loaded {count} saved sessions")
         except Exception as e:
-            print(f"Error loading sessions: {e}")
-            self.sessions = {}
+            self.store.log('error', f"Error loading sessions: {e}")
     
-    def save_sessions(self):
-        try:
-            with open(self.sessions_file, 'wb') as f:
-                pickle.dump(self.sessions, f)
-        except Exception as e:
-            print(f"Error saving sessions: {e}")
+    def migrate_legacy_sessions(self):
+        with open(self.legacy_sessions_file, 'rb') as f:
+            legacy = pickle.load(f)
+        for key, data in legacy.items():
+            self.save_session(key, data)
+        self.store.flush()
+        os.replace(self.legacy_sessions_file, self.legacy_sessions_file + '.migrated')
+        self.store.log('info', f"Migrated {len(legacy)} sessions from {self.legacy_sessions_file}")
+    
+    def save_session(self, key: str, data: Dict):
+        self.store.write('INSERT OR REPLACE INTO sessions (key, data) VALUES (?, ?)', (key, json.dumps(data, default=str)), key=('sessions', key))
+    
+    def _load(self, key: str) -> Optional[Dict]:
+        if key not in self.sessions:
+            rows = self.store.query('SELECT data FROM sessions WHERE key = ?', (key,))
+            self.sessions[key] = json.loads(rows[0][0]) if rows else None
+        return self.sessions[key]
     
     def get_session(self, address: str) -> Optional[Dict]:
         key = self.get_session_key(address)
         with self.lock:
-            return self.sessions.get(key)
+            return self._load(key)
     
     def update_session(self, address: str, data: Dict):
         key = self.get_session_key(address)
         with self.lock:
-            if key not in self.sessions:
-                self.sessions[key] = {
+            session = self._load(key)
+            if session is None:
+                session = self.sessions[key] = {
                     'created_at': datetime.now().isoformat(),
                     'login_attempts': 0,
                     'last_success': None,
                     'failures': 0
                 }
-            self.sessions[key].update(data)
-            self.sessions[key]['last_updated'] = datetime.now().isoformat()
-            self.sessions[key]['failures'] = 0
-            self.save_sessions()
+            session.update(data)
+            session['last_updated'] = datetime.now().isoformat()
+            session['failures'] = 0
+            self.save_session(key, session)
     
     def increment_failures(self, address: str):
         key = self.get_session_key(address)
         with self.lock:
-            if key in self.sessions:
-                self.sessions[key]['failures'] = self.sessions[key].get('failures', 0) + 1
-                self.sessions[key]['last_failure'] = datetime.now().isoformat()
-                self.save_sessions()
+            session = self._load(key)
+            if session is not None:
+                session['failures'] = session.get('failures', 0) + 1
+                session['last_failure'] = datetime.now().isoformat()
+                self.save_session(key, session)
     
     def should_retry_login(self, address: str) -> Tuple[bool, int]:
-        key = self.get_session_key(address)
-        session = self.sessions.get(key, {})
+        session = self.get_session(address) or {}
         failures = session.get('failures', 0)
+        if failures == 0:
+            return (True, 0)
         delay = min(300, 5 * (3 ** min(failures, 4)))
         if failures > 5:
             wait_hours = (failures - 5) * 2
             delay = max(delay, wait_hours * 3600)
-        return (failures < 10, delay)
+        last_failure = session.get('last_failure')
+        if last_failure:
+            elapsed = (datetime.now() - datetime.fromisoformat(last_failure)).total_seconds()
+            delay = max(0, delay - elapsed)
+        return (failures < 10, int(delay))
+
+def decode_token_expiry(token: str) -> Optional[float]:
+    """Baca claim exp dari JWT Privy tanpa verifikasi signature"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+class TokenStore:
+    """Cache token per address dengan index di memori"""
+    def __init__(self, store: StateStore, max_age: float = 12 * 3600, verify_margin: float = 600):
+        self.store = store
+        self.max_age = max_age
+        self.verify_margin = verify_margin
+        self.legacy_dir = 'tokens'
+        self.index = {}
+        self.lock = threading.Lock()
+        self.store.ensure_schema(
+            'CREATE TABLE IF NOT EXISTS tokens (address TEXT PRIMARY KEY, user_id TEXT, token TEXT NOT NULL, '
+            'saved_at REAL NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self.load()
+    
+    def load(self):
+        if self.store.persistent and os.path.isdir(self.legacy_dir):
+            try:
+                self.migrate_legacy_tokens()
+            except Exception as e:
+                self.store.log('error', f"Error migrating tokens from {self.legacy_dir}/: {e}")
+        try:
+            self.purge_expired()
+            rows = self.store.query('SELECT address, user_id, token, saved_at, expires_at FROM tokens WHERE expires_at > ?', (time.time(),))
+            for address, user_id, token, saved_at, expires_at in rows:
+                self.index[address] = (token, user_id, saved_at, expires_at, decode_token_expiry(token) is not None)
+        except Exception as e:
+            self.store.log('error', f"Error loading tokens: {e}")
+    
+    def migrate_legacy_tokens(self):
+        latest = {}
+        for filename in os.listdir(self.legacy_dir):
+            try:
+                with open(os.path.join(self.legacy_dir, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                saved_at = datetime.fromisoformat(data['saved_at']).timestamp()
+                address = data['address'].lower()
+                if address not in latest or saved_at > latest[address][2]:
+                    latest[address] = (data['token'], data.get('user_id'), saved_at)
+            except Exception:
+                continue
+        for address, (token, user_id, saved_at) in latest.items():
+            self.put(address, user_id, token, saved_at=saved_at)
+        self.store.flush()
+        os.replace(self.legacy_dir, self.legacy_dir + '.migrated')
+        self.store.log('info', f"Migrated {len(latest)} tokens from {self.legacy_dir}/")
+    
+    def get(self, address: str) -> Optional[str]:
+        return self.lookup(address)[0]
+    
+    def lookup(self, address: str) -> Tuple[Optional[str], bool]:
+        """Returns (token, perlu_verifikasi); token yang jelas expired langsung dibuang"""
+        key = address.lower()
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None, False
+            remaining = entry[3] - time.time()
+            if remaining <= 0:
+                self.delete(key)
+                return None, False
+            exp_known = entry[4]
+            return entry[0], not exp_known or remaining <= self.verify_margin
+    
+    def put(self, address: str, user_id: Optional[str], token: str, saved_at: Optional[float] = None):
+        key = address.lower()
+        saved_at = saved_at or time.time()
+        token_exp = decode_token_expiry(token)
+        expires_at = token_exp if token_exp is not None else saved_at + self.max_age
+        with self.lock:
+            self.index[key] = (token, user_id, saved_at, expires_at, token_exp is not None)
+        self.store.write(
+            'INSERT OR REPLACE INTO tokens (address, user_id, token, saved_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+            (key, user_id, token, saved_at, expires_at), key=('tokens', key)
+        )
+    
+    def expires_at(self, address: str) -> Optional[float]:
+        with self.lock:
+            entry = self.index.get(address.lower())
+            return entry[3] if entry else None
+    
+    def invalidate(self, address: str):
+        with self.lock:
+            self.delete(address.lower())
+    
+    def delete(self, key: str):
+        self.index.pop(key, None)
+        self.store.write('DELETE FROM tokens WHERE address = ?', (key,), key=('tokens', key))
+    
+    def purge_expired(self) -> int:
+        now_ts = time.time()
+        with self.lock:
+            for key in [k for k, entry in self.index.items() if entry[3] <= now_ts]:
+                self.index.pop(key)
+        self.store.write('DELETE FROM tokens WHERE expires_at <= ?', (now_ts,))
+        return len(self.index)
+
+class CycleJournal:
+    """Journal append-only hasil per wallet dan jadwal cycle, untuk resume setelah crash"""
+    def __init__(self, store: StateStore, keep_cycles: int = 30):
+        self.store = store
+        self.keep_cycles = keep_cycles
+        self.cycle = 0
+        self.finished = {}
+        self.extras_done = set()
+        self.lock = threading.Lock()
+        self.store.ensure_schema(
+            'CREATE TABLE IF NOT EXISTS cycle_journal (id INTEGER PRIMARY KEY AUTOINCREMENT, cycle INTEGER NOT NULL, '
+            'event TEXT NOT NULL, address TEXT, value REAL, at REAL NOT NULL)',
+            'CREATE INDEX IF NOT EXISTS cycle_journal_cycle ON cycle_journal (cycle, event)'
+        )
+    
+    def append(self, event: str, address: Optional[str] = None, value: Optional[float] = None):
+        self.store.write(
+            'INSERT INTO cycle_journal (cycle, event, address, value, at) VALUES (?, ?, ?, ?, ?)',
+            (self.cycle, event, address, value, time.time())
+        )
+    
+    def resume(self) -> Tuple[int, Optional[float]]:
+        """Returns (cycle terakhir, next_run); next_run None berarti cycle itu belum selesai"""
+        rows = self.store.query('SELECT MAX(cycle) FROM cycle_journal')
+        cycle = rows[0][0] or 0
+        if not cycle:
+            return 0, None
+        rows = self.store.query("SELECT value FROM cycle_journal WHERE cycle = ? AND event = 'finish' ORDER BY id DESC LIMIT 1", (cycle,))
+        return cycle, rows[0][0] if rows else None
+    
+    def load(self, cycle: int):
+        rows = self.store.query("SELECT address, value FROM cycle_journal WHERE cycle = ? AND event = 'wallet'", (cycle,))
+        finished = {address: bool(value) for address, value in rows}
+        rows = self.store.query("SELECT address FROM cycle_journal WHERE cycle = ? AND event = 'extras'", (cycle,))
+        extras_done = {address for address, in rows}
+        with self.lock:
+            self.cycle = cycle
+            self.finished = finished
+            self.extras_done = extras_done
+    
+    def begin(self, cycle: int):
+        if cycle == self.cycle:
+            return
+        self.load(cycle)
+        started = self.store.query("SELECT 1 FROM cycle_journal WHERE cycle = ? AND event = 'start' LIMIT 1", (cycle,))
+        if not started:
+            with self.lock:
+                self.append('start')
+                self.store.write('DELETE FROM cycle_journal WHERE cycle <= ?', (cycle - self.keep_cycles,))
+        self.store.flush()
+    
+    def is_finished(self, address: str, phase: int = 1) -> bool:
+        if phase == 1:
+            return address.lower() in self.finished
+        return address.lower() in self.extras_done
+    
+    def record_wallet(self, address: str, daily_claimed: bool):
+        key = address.lower()
+        with self.lock:
+            self.finished[key] = daily_claimed
+            self.append('wallet', key, 1 if daily_claimed else 0)
+    
+    def record_extras(self, address: str):
+        key = address.lower()
+        with self.lock:
+            self.extras_done.add(key)
+            self.append('extras', key)
+    
+    def daily_success(self, wallets: List['WalletRecord']) -> int:
+        return sum(1 for wallet in wallets if self.finished.get(wallet.address.lower()))
+    
+    def finish(self, next_run: float):
+        with self.lock:
+            self.append('finish', value=next_run)
+        self.store.flush()
+
+class TaskLedger:
+    """Status task per wallet (done, ineligible dengan TTL, daily) dan snapshot daftar task terakhir"""
+    def __init__(self, store: StateStore, daily_tasks: frozenset = frozenset(), ineligible_ttl: float = 3 * 86400, daily_ttl: float = 20 * 3600, catalog_ttl: float = 6 * 3600, snapshot_max_age: float = 7 * 86400):
+        self.store = store
+        self.daily_tasks = daily_tasks
+        self.ttls = {'done': None, 'ineligible': ineligible_ttl, 'daily': daily_ttl}
+        self.catalog_ttl = catalog_ttl
+        self.snapshot_max_age = snapshot_max_age
+        self.states = {}
+        self.snapshots = {}
+        self.catalog = (None, 0.0)
+        self.lock = threading.Lock()
+        self.store.ensure_schema(
+            'CREATE TABLE IF NOT EXISTS task_ledger (address TEXT NOT NULL, task_id TEXT NOT NULL, state TEXT NOT NULL, '
+            'until REAL, PRIMARY KEY (address, task_id))',
+            'CREATE TABLE IF NOT EXISTS task_snapshots (address TEXT PRIMARY KEY, etag TEXT, digest TEXT NOT NULL, '
+            'tasks TEXT NOT NULL, fetched_at REAL NOT NULL)'
+        )
+        self.load()
+    
+    def load(self):
+        try:
+            now_ts = time.time()
+            self.store.write('DELETE FROM task_ledger WHERE until IS NOT NULL AND until <= ?', (now_ts,))
+            rows = self.store.query('SELECT address, task_id, state, until FROM task_ledger WHERE until IS NULL OR until > ?', (now_ts,))
+            for address, task_id, state, until in rows:
+                self.states.setdefault(address, {})[task_id] = (state, until)
+            rows = self.store.query('SELECT address, etag, digest, tasks, fetched_at FROM task_snapshots')
+            for address, etag, digest, tasks, fetched_at in rows:
+                self.snapshots[address] = (etag, digest, tasks, fetched_at)
+        except Exception as e:
+            self.store.log('error', f"Error loading task ledger: {e}")
+    
+    @staticmethod
+    def digest(tasks: List[Dict]) -> str:
+        ids = sorted(str(task.get('id')) for task in tasks)
+        return hashlib.sha1(','.join(ids).encode()).hexdigest()[:16]
+    
+    def state(self, address: str, task_id: str) -> Optional[str]:
+        with self.lock:
+            entry = self.states.get(address.lower(), {}).get(task_id)
+        if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+            return None
+        return entry[0]
+    
+    def is_settled(self, address: str, task_id: str) -> bool:
+        return self.state(address, task_id) is not None
+    
+    def record(self, address: str, task_id: str, state: str):
+        key = address.lower()
+        ttl = self.ttls[state]
+        until = time.time() + ttl if ttl is not None else None
+        with self.lock:
+            self.states.setdefault(key, {})[task_id] = (state, until)
+        self.store.write(
+            'INSERT OR REPLACE INTO task_ledger (address, task_id, state, until) VALUES (?, ?, ?, ?)',
+            (key, task_id, state, until), key=('task_ledger', key, task_id)
+        )
+    
+    def record_claim(self, address: str, task_id: str, claimed: bool):
+        """Claim sukses atau ditolak 400: daily sudah diklaim hari ini, task lain done atau ineligible"""
+        if task_id in self.daily_tasks:
+            self.record(address, task_id, 'daily')
+        else:
+            self.record(address, task_id, 'done' if claimed else 'ineligible')
+    
+    def etag(self, address: str) -> Optional[str]:
+        with self.lock:
+            snapshot = self.snapshots.get(address.lower())
+        return snapshot[0] if snapshot else None
+    
+    @staticmethod
+    def load_snapshot(body: str) -> List[Dict]:
+        """Flag done dari server tidak dipakai ulang; status done/daily hanya dari ledger (dengan TTL)"""
+        tasks = json.loads(body)
+        for task in tasks:
+            task.pop('done', None)
+        return tasks
+    
+    def observe(self, address: str, tasks: List[Dict], etag: Optional[str] = None):
+        key = address.lower()
+        digest = self.digest(tasks)
+        now_ts = time.time()
+        body = json.dumps([{k: v for k, v in task.items() if k != 'done'} for task in tasks], separators=(',', ':'))
+        with self.lock:
+            self.snapshots[key] = (etag, digest, body, now_ts)
+            self.catalog = (digest, now_ts)
+        self.store.write(
+            'INSERT OR REPLACE INTO task_snapshots (address, etag, digest, tasks, fetched_at) VALUES (?, ?, ?, ?, ?)',
+            (key, etag, digest, body, now_ts), key=('task_snapshots', key)
+        )
+        for task in tasks:
+            if task.get('done', False) and not self.is_settled(address, task.get('id')):
+                self.record(address, task.get('id'), 'daily' if task.get('id') in self.daily_tasks else 'done')
+    
+    def not_modified(self, address: str) -> Optional[List[Dict]]:
+        """Daftar task dari snapshot setelah server menjawab 304"""
+        with self.lock:
+            snapshot = self.snapshots.get(address.lower())
+        if snapshot is None:
+            return None
+        tasks = self.load_snapshot(snapshot[2])
+        self.observe(address, tasks, snapshot[0])
+        return tasks
+    
+    def cached_tasks(self, address: str) -> Optional[List[Dict]]:
+        """Snapshot wallet dipakai tanpa fetch kalau id task-nya sama dengan katalog yang baru diverifikasi wallet lain"""
+        now_ts = time.time()
+        with self.lock:
+            snapshot = self.snapshots.get(address.lower())
+            digest, verified_at = self.catalog
+        if snapshot is None or digest is None or snapshot[1] != digest:
+            return None
+        if now_ts - verified_at > self.catalog_ttl or now_ts - snapshot[3] > self.snapshot_max_age:
+            return None
+        return self.load_snapshot(snapshot[2])
+    
+    def describe(self) -> str:
+        now_ts = time.time()
+        with self.lock:
+            settled = sum(1 for states in self.states.values() for _, until in states.values() if until is None or until > now_ts)
+            return f"{settled} settled tasks across {len(self.states)} wallets, {len(self.snapshots)} task snapshots"
+
+class ResultStore:
+    """Hasil per wallet per cycle (daily, claim, XP, latency) dengan agregasi langsung di SQLite"""
+    def __init__(self, store: StateStore):
+        self.store = store
+        self.store.ensure_schema(
+            'CREATE TABLE IF NOT EXISTS wallet_results (cycle INTEGER NOT NULL, address TEXT NOT NULL, daily INTEGER NOT NULL, '
+            'claimed INTEGER NOT NULL, xp INTEGER NOT NULL, failed INTEGER NOT NULL, seconds REAL NOT NULL, requests INTEGER NOT NULL, '
+            'at REAL NOT NULL, PRIMARY KEY (cycle, address))',
+            'CREATE INDEX IF NOT EXISTS wallet_results_address ON wallet_results (address, cycle)',
+            'CREATE INDEX IF NOT EXISTS wallet_results_misses ON wallet_results (address, cycle) WHERE daily = 0'
+        )
+    
+    def record(self, cycle: int, address: str, daily: bool, claimed: int, xp: int, failed: bool, seconds: float, requests: int):
+        """Phase kedua wallet yang sama menambah claim, XP, durasi dan request ke baris cycle itu"""
+        self.store.write(
+            'INSERT INTO wallet_results (cycle, address, daily, claimed, xp, failed, seconds, requests, at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (cycle, address) DO UPDATE SET daily = MAX(daily, excluded.daily), claimed = claimed + excluded.claimed, '
+            'xp = xp + excluded.xp, failed = MAX(failed, excluded.failed), seconds = seconds + excluded.seconds, '
+            'requests = requests + excluded.requests, at = excluded.at',
+            (cycle, address.lower(), int(daily), claimed, xp, int(failed), seconds, requests, time.time())
+        )
+    
+    def last_cycle(self) -> int:
+        return self.store.query('SELECT MAX(cycle) FROM wallet_results')[0][0] or 0
+    
+    def per_cycle(self, cycles: int) -> List[Tuple]:
+        return self.store.query(
+            'SELECT cycle, MIN(at), COUNT(*), SUM(daily), SUM(claimed), SUM(xp), SUM(failed), AVG(seconds) '
+            'FROM wallet_results WHERE cycle > ? GROUP BY cycle ORDER BY cycle', (self.last_cycle() - cycles,)
+        )
+    
+    def streaks(self, top: int) -> Tuple[List[Tuple], int, int]:
+        """Returns (streak terpanjang, wallet yang check-in di cycle terakhir, wallet di cycle terakhir); streak dihitung sejak check-in gagal terakhir"""
+        last = self.last_cycle()
+        rows = self.store.query(
+            'SELECT r.address, ? - COALESCE('
+            '(SELECT MAX(m.cycle) FROM wallet_results m WHERE m.address = r.address AND m.daily = 0), '
+            '(SELECT MIN(f.cycle) FROM wallet_results f WHERE f.address = r.address) - 1) AS streak '
+            'FROM wallet_results r WHERE r.cycle = ? AND r.daily = 1 ORDER BY streak DESC, r.address LIMIT ?', (last, last, top)
+        )
+        counts = self.store.query('SELECT SUM(daily), COUNT(*) FROM wallet_results WHERE cycle = ?', (last,))[0]
+        return rows, counts[0] or 0, counts[1]
+    
+    def slowest(self, cycles: int, top: int) -> List[Tuple]:
+        return self.store.query(
+            'SELECT address, AVG(seconds), MAX(seconds), AVG(requests), COUNT(*) FROM wallet_results WHERE cycle > ? '
+            'GROUP BY address ORDER BY AVG(seconds) DESC LIMIT ?', (self.last_cycle() - cycles, top)
+        )
+    
+    def failing(self, cycles: int, top: int) -> List[Tuple]:
+        since = self.last_cycle() - cycles
+        return self.store.query(
+            'SELECT address, missed, failed, (SELECT COUNT(*) FROM wallet_results c WHERE c.address = w.address AND c.cycle > ?), last_missed '
+            'FROM (SELECT address, SUM(1 - daily) AS missed, SUM(failed) AS failed, MAX(CASE WHEN daily = 0 THEN cycle END) AS last_missed '
+            'FROM wallet_results WHERE cycle > ? AND daily = 0 GROUP BY address ORDER BY missed DESC, failed DESC LIMIT ?) w',
+            (since, since, top)
+        )
+
+class Profiler:
+    """cProfile per cycle, diff tracemalloc antar cycle, dan span per wallet (login, fetch, claims, sleep)"""
+    KINDS = ('login', 'fetch', 'claims', 'sleep')
+    
+    def __init__(self, directory: str, pacing: float = 1.0, top: int = 25):
+        self.directory = directory
+        self.pacing = pacing
+        self.top = top
+        self.cycle = 0
+        self.started = 0.0
+        self.profile = None
+        self.total_stats = None
+        self.baseline = None
+        self.previous = None
+        self.spans = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+    
+    @staticmethod
+    def short_path(filename: str) -> str:
+        return '/'.join(filename.replace(os.sep, '/').split('/')[-2:])
+    
+    def snapshot(self) -> 'tracemalloc.Snapshot':
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+    
+    def start_cycle(self, cycle: int):
+        if self.profile:
+            self.profile.disable()
+        self.cycle = cycle
+        self.spans = {}
+        if self.previous is None:
+            self.baseline = self.previous = self.snapshot()
+        self.started = time.monotonic()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+    
+    @contextlib.contextmanager
+    def span(self, address: str, kind: str, budget: Optional['RetryBudget'] = None):
+        """Wall-clock satu fase wallet; backoff yang terjadi di dalamnya dihitung sebagai sleep"""
+        started = time.monotonic()
+        backoff = budget.backoff_time if budget else 0.0
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            slept = min(elapsed, (budget.backoff_time - backoff) * self.pacing) if budget else 0.0
+            with self.lock:
+                spans = self.spans.setdefault(address.lower(), dict.fromkeys(self.KINDS, 0.0))
+                spans[kind] += elapsed - slept
+                spans['sleep'] += slept
+    
+    def finish_cycle(self) -> Optional[str]:
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        duration = time.monotonic() - self.started
+        prefix = os.path.join(self.directory, f"cycle-{self.cycle:04d}")
+        self.profile.dump_stats(prefix + '.prof')
+        stats = pstats.Stats(prefix + '.prof')
+        if self.total_stats is None:
+            self.total_stats = pstats.Stats(prefix + '.prof')
+        else:
+            self.total_stats.add(prefix + '.prof')
+        self.profile = None
+        current = self.snapshot()
+        growth = current.compare_to(self.previous, 'lineno')
+        total_growth = current.compare_to(self.baseline, 'lineno')
+        self.previous = current
+        with open(prefix + '-memory.txt', 'w', encoding='utf-8') as f:
+            for stat in growth[:self.top * 4]:
+                f.write(f"{stat}\n")
+        with self.lock:
+            spans = dict(self.spans)
+        with open(prefix + '-spans.jsonl', 'w', encoding='utf-8') as f:
+            for address, values in spans.items():
+                f.write(json.dumps({'address': address, **{kind: round(value, 3) for kind, value in values.items()}}) + "\n")
+        summary = self.summarize(duration, stats, growth, total_growth, spans)
+        for path in (prefix + '-summary.txt', os.path.join(self.directory, 'summary.txt')):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(summary)
+        return os.path.join(self.directory, 'summary.txt')
+    
+    def hot_functions(self, stats: pstats.Stats, key: str) -> List[str]:
+        lines = [f"  {'own s':>9} {'cum s':>9} {'calls':>9}  function"]
+        stats.sort_stats(key)
+        for func in stats.fcn_list[:self.top]:
+            _, calls, own, cumulative, _ = stats.stats[func]
+            filename, line, name = func
+            location = f"{self.short_path(filename)}:{line}({name})" if line else name
+            lines.append(f"  {own:>9.3f} {cumulative:>9.3f} {calls:>9}  {location}")
+        return lines
+    
+    def memory_growth(self, growth: List['tracemalloc.StatisticDiff']) -> List[str]:
+        lines = []
+        for stat in [stat for stat in growth if stat.size_diff > 0][:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size_diff / 1024:>+10.1f} KiB {stat.count_diff:>+9} blocks  {self.short_path(frame.filename)}:{frame.lineno}")
+        return lines or ["  none"]
+    
+    def span_table(self, spans: Dict[str, Dict[str, float]]) -> List[str]:
+        if not spans:
+            return ["  no wallets processed"]
+        lines = [f"  {'span':<7} {'total s':>10} {'p50 s':>8} {'p95 s':>8} {'max s':>8}"]
+        for kind in self.KINDS:
+            values = sorted(entry[kind] for entry in spans.values())
+            lines.append(
+                f"  {kind:<7} {sum(values):>10.1f} {values[len(values) // 2]:>8.2f} "
+                f"{values[int(0.95 * (len(values) - 1))]:>8.2f} {values[-1]:>8.2f}"
+            )
+        lines.append(f"\n  slowest wallets ({'login':>7} {'fetch':>7} {'claims':>7} {'sleep':>7})")
+        slowest = sorted(spans.items(), key=lambda item: sum(item[1].values()), reverse=True)[:10]
+        for address, entry in slowest:
+            lines.append(f"  {address[:12]}... {sum(entry.values()):>6.1f}s ({' '.join(f'{entry[kind]:>7.2f}' for kind in self.KINDS)})")
+        return lines
+    
+    def summarize(self, duration: float, stats: pstats.Stats, growth, total_growth, spans: Dict[str, Dict[str, float]]) -> str:
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"CYCLE #{self.cycle} PROFILE - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Duration {duration:.1f}s, {len(spans)} wallets, traced memory {current / 1048576:.1f} MiB (peak {peak / 1048576:.1f} MiB)",
+            "cProfile covers the main thread only (event loop or sequential engine).",
+            "",
+            "HOT FUNCTIONS BY OWN TIME (this cycle)",
+            *self.hot_functions(stats, 'tottime'),
+            "",
+            "HOT FUNCTIONS BY CUMULATIVE TIME (this cycle)",
+            *self.hot_functions(stats, 'cumulative'),
+            "",
+            "HOT FUNCTIONS BY OWN TIME (all profiled cycles)",
+            *self.hot_functions(self.total_stats, 'tottime'),
+            "",
+            "LARGEST MEMORY GROWTH (since previous cycle)",
+            *self.memory_growth(growth),
+            "",
+            "LARGEST MEMORY GROWTH (since profiling started)",
+            *self.memory_growth(total_growth),
+            "",
+            "WALLET SPANS (wall-clock; backoff inside login/fetch/claims counted as sleep)",
+            *self.span_table(spans),
+        ]
+        return "\n".join(lines) + "\n"
+
+class Metrics:
+    """Registry metrics in-process (counter, gauge, histogram) dengan output format text Prometheus"""
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    HELP = {
+        'pipworld_http_requests_total': ('counter', 'HTTP attempts by host, endpoint and status code or exception'),
+        'pipworld_http_request_duration_seconds': ('histogram', 'Latency of a single HTTP attempt'),
+        'pipworld_http_retries_total': ('counter', 'HTTP attempts that were retries of an earlier attempt'),
+        'pipworld_backoff_seconds_total': ('counter', 'Time spent sleeping in backoff and rate limiting'),
+        'pipworld_wallet_deferrals_total': ('counter', 'Wallets parked in the scheduler instead of sleeping'),
+        'pipworld_login_total': ('counter', 'Login attempts by strategy and result'),
+        'pipworld_login_duration_seconds': ('histogram', 'Duration of a login strategy including its retries'),
+        'pipworld_task_operations_total': ('counter', 'Task fetches and claims by result'),
+        'pipworld_task_operation_duration_seconds': ('histogram', 'Duration of a task fetch or claim including its retries'),
+        'pipworld_cycles_total': ('counter', 'Completed cycles'),
+        'pipworld_cycle_duration_seconds': ('gauge', 'Duration of the last cycle'),
+        'pipworld_cycle_wallets': ('gauge', 'Wallets in the last cycle'),
+        'pipworld_cycle_daily_success_ratio': ('gauge', 'Share of wallets with a daily check-in in the last cycle'),
+        'pipworld_cycle_failed_wallets': ('gauge', 'Wallets that failed login or task fetch in the last cycle'),
+    }
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.server = None
+    
+    @staticmethod
+    def series_key(name: str, labels: Dict) -> Tuple:
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+    
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = self.series_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+    
+    def set(self, name: str, value: float, **labels):
+        key = self.series_key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+    
+    def observe(self, name: str, value: float, **labels):
+        key = self.series_key(name, labels)
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(self.BUCKETS)] += 1
+            hist[-1] += value
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {'counters': dict(self.counters), 'histograms': {key: list(hist) for key, hist in self.histograms.items()}}
+    
+    def merge(self, snapshot: Dict):
+        """Gabungkan snapshot dari proses shard"""
+        with self.lock:
+            for key, value in snapshot['counters'].items():
+                self.counters[key] = self.counters.get(key, 0.0) + value
+            for key, hist in snapshot['histograms'].items():
+                current = self.histograms.setdefault(key, [0] * (len(self.BUCKETS) + 1) + [0.0])
+                for i, value in enumerate(hist):
+                    current[i] += value
+    
+    @staticmethod
+    def format_labels(labels, extra: str = '') -> str:
+        parts = [f'{name}="{value}"' for name, value in labels]
+        if extra:
+            parts.append(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+    
+    def render(self) -> str:
+        with self.lock:
+            series = {}
+            for (name, labels), value in sorted(itertools.chain(self.counters.items(), self.gauges.items())):
+                series.setdefault(name, []).append(f"{name}{self.format_labels(labels)} {value:g}")
+            for (name, labels), hist in sorted(self.histograms.items()):
+                lines = series.setdefault(name, [])
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS + ('+Inf',), hist):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{name}_bucket{self.format_labels(labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{self.format_labels(labels)} {hist[-1]:g}")
+                lines.append(f"{name}_count{self.format_labels(labels)} {cumulative}")
+        output = []
+        for name in sorted(series):
+            kind, description = self.HELP.get(name, ('untyped', name))
+            output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return '\n'.join(output) + '\n'
+    
+    def serve(self, port: int, host: str = '127.0.0.1'):
+        metrics = self
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True).start()
+
+@functools.lru_cache(maxsize=1024)
+def endpoint_label(url: str) -> str:
+    """Path URL untuk label metrics; segmen ID (task id, dll) diganti :id supaya cardinality tetap kecil"""
+    path = urlparse(url).path or '/'
+    return '/'.join(':id' if len(part) >= 16 and any(c.isdigit() for c in part) else part for part in path.split('/'))
+
+class TTLCache:
+    """Dict thread-safe dengan TTL, batas ukuran (eviction LRU) dan expiry di background"""
+    reaper = None
+    reaper_lock = threading.Lock()
+    instances = weakref.WeakSet()
+    reap_interval = 60
+    
+    def __init__(self, maxsize: int, ttl: float, name: str = ''):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.data = OrderedDict()
+        self.lock = threading.RLock()
+        self.evictions = 0
+        self.expirations = 0
+        TTLCache.register(self)
+    
+    @classmethod
+    def register(cls, cache: 'TTLCache'):
+        with cls.reaper_lock:
+            cls.instances.add(cache)
+            if cls.reaper is None:
+                cls.reaper = threading.Thread(target=cls.reap_forever, name='ttl-reaper', daemon=True)
+                cls.reaper.start()
+    
+    @classmethod
+    def reap_forever(cls):
+        while True:
+            time.sleep(cls.reap_interval)
+            with cls.reaper_lock:
+                caches = list(cls.instances)
+            for cache in caches:
+                try:
+                    cache.expire()
+                except Exception as e:
+                    print(f"Error expiring {cache.name}: {e}", file=sys.stderr)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return default
+            if entry[1] <= time.monotonic():
+                del self.data[key]
+                self.expirations += 1
+                return default
+            self.data.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key, value):
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = (value, time.monotonic() + self.ttl)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+    
+    def expire(self) -> int:
+        """Hapus entry expired; scan penuh karena urutan LRU bukan urutan expiry"""
+        now_ts = time.monotonic()
+        with self.lock:
+            expired = [key for key, (_, expires_at) in self.data.items() if expires_at <= now_ts]
+            for key in expired:
+                del self.data[key]
+            self.expirations += len(expired)
+        return len(expired)
+    
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'size': len(self.data), 'maxsize': self.maxsize, 'evictions': self.evictions, 'expirations': self.expirations}
+    
+    def describe(self) -> str:
+        stats = self.stats()
+        return f"{self.name} {stats['size']}/{stats['maxsize']} ({stats['evictions']} evicted, {stats['expirations']} expired)"
 
 class SmartRequestManager:
     """Manajer request adaptif"""
-    def __init__(self):
-        self.request_history = {}
-        self.proxy_status = {}
+    def __init__(self, max_history: int = 50000, max_proxies: int = 10000):
+        self.request_history = TTLCache(max_history, 3600, 'request history')
+        self.proxy_status = TTLCache(max_proxies, 1800, 'proxy status')
         self.min_delay = 2
         self.max_delay = 10
     
     def get_adaptive_delay(self, address: str, endpoint: str) -> float:
         key = f"{address}_{endpoint}"
         now_ts = time.time()
-        if key in self.request_history and now_ts - self.request_history[key] > 3600:
-            del self.request_history[key]
-        if key in self.request_history:
-            last_request = self.request_history[key]
-            elapsed = now_ts - last_request
-            if elapsed < 30:
-                return random.uniform(3, 7)
-        self.request_history[key] = now_ts
+        last_request = self.request_history.get(key)
+        if last_request is not None and now_ts - last_request < 30:
+            return random.uniform(3, 7)
+        self.request_history.set(key, now_ts)
         return random.uniform(self.min_delay, self.max_delay)
     
     def mark_proxy_failure(self, proxy: str):
-        if proxy not in self.proxy_status:
-            self.proxy_status[proxy] = {'failures': 0, 'last_failure': time.time()}
-        self.proxy_status[proxy]['failures'] += 1
-        self.proxy_status[proxy]['last_failure'] = time.time()
+        with self.proxy_status.lock:
+            failures, _ = self.proxy_status.get(proxy, (0, 0))
+            self.proxy_status.set(proxy, (failures + 1, time.time()))
     
     def is_proxy_healthy(self, proxy: str) -> bool:
-        if not proxy or proxy not in self.proxy_status:
+        if not proxy:
+            return True
+        status = self.proxy_status.get(proxy)
+        if status is None:
             return True
-        status = self.proxy_status[proxy]
-        failures = status.get('failures', 0)
-        last_failure = status.get('last_failure', 0)
+        failures, last_failure = status
         if failures > 5 and time.time() - last_failure < 600:
             return False
-        if time.time() - last_failure > 1800:
-            self.proxy_status[proxy]['failures'] = 0
         return True
+    
+    def describe(self) -> str:
+        return f"{self.request_history.describe()}, {self.proxy_status.describe()}"
 
-class PipWorldAutoTask:
+DEFAULT_HOST_RATES = {
+    urlparse(PRIVY_BASE_URL).hostname: (2.0, 5),
+    urlparse(API_BASE_URL).hostname: (5.0, 10),
+}
+
+def parse_retry_after(value, default: float = 60) -> float:
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return default
+
+class HostRateLimiter:
+    """Token bucket per host untuk semua worker; Retry-After mem-pause seluruh bucket host"""
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.rates = dict(DEFAULT_HOST_RATES if rates is None else rates)
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.throttled = 0
+        self.pauses = 0
+        self.wait_time = 0.0
+    
+    def reserve(self, host: str) -> float:
+        """Ambil satu token; return 0 jika berhasil, atau detik yang harus ditunggu"""
+        rate = self.rates.get(host)
+        if rate is None:
+            return 0.0
+        per_second, burst = rate
+        now_ts = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = {'tokens': float(burst), 'updated': now_ts, 'paused_until': 0.0}
+            if now_ts < bucket['paused_until']:
+                wait = bucket['paused_until'] - now_ts
+            else:
+                bucket['tokens'] = min(burst, bucket['tokens'] + (now_ts - bucket['updated']) * per_second)
+                bucket['updated'] = now_ts
+                if bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return 0.0
+                wait = (1 - bucket['tokens']) / per_second
+            self.throttled += 1
+            self.wait_time += wait
+            return wait
+    
+    def pause(self, host: str, seconds: float):
+        now_ts = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.setdefault(host, {'tokens': 0.0, 'updated': now_ts, 'paused_until': 0.0})
+            if now_ts + seconds > bucket['paused_until']:
+                bucket['paused_until'] = now_ts + seconds
+                bucket['tokens'] = 0.0
+                bucket['updated'] = bucket['paused_until']
+                self.pauses += 1
+    
+    def split(self, count: int) -> Dict[str, Tuple[float, float]]:
+        """Bagi rate per host untuk count proses supaya total tetap sama"""
+        return {host: (per_second / count, max(1.0, burst / count)) for host, (per_second, burst) in self.rates.items()}
+    
+    def describe(self) -> str:
+        with self.lock:
+            return f"{self.throttled} throttled waits ({self.wait_time:.0f}s), {self.pauses} Retry-After pauses"
+
+class SignerCache:
+    """Cache objek account eth_account per private key; format dicek saat load, di-parse sekali saat signing pertama"""
+    HEX_KEY = re.compile(r'0x[0-9a-fA-F]{64}')
+    
+    def __init__(self):
+        self.accounts = {}
+        self.lock = threading.Lock()
+    
+    def normalize(self, private_key: str) -> Optional[str]:
+        if not private_key.startswith('0x'):
+            private_key = '0x' + private_key
+        return private_key if self.HEX_KEY.fullmatch(private_key) else None
+    
+    def get(self, private_key: str):
+        account = self.accounts.get(private_key)
+        if account is None and private_key not in self.accounts:
+            normalized = self.normalize(private_key)
+            account = load_signing_deps().from_key(normalized) if normalized else None
+            with self.lock:
+                self.accounts[private_key] = account
+        return account
+    
+    def preload(self, private_key: str) -> bool:
+        return self.normalize(private_key) is not None
+
+class WalletRecord:
+    """Record wallet ringkas"""
+    __slots__ = ('address', 'private_key', 'proxy', 'index')
+    
+    def __init__(self, address: str, private_key: str, proxy: Optional[str], index: int):
+        self.address = address
+        self.private_key = private_key
+        self.proxy = proxy
+        self.index = index
+
+def shard_of(address: str, count: int) -> int:
+    """Shard stabil per address, tidak tergantung urutan wallets.txt atau PYTHONHASHSEED"""
+    return int.from_bytes(hashlib.md5(address.lower().encode()).digest()[:8], 'big') % count
+
+@functools.lru_cache(maxsize=4096)
+def is_valid_proxy(proxy: str) -> bool:
+    try:
+        if proxy.startswith(('http://', 'https://', 'socks4://', 'socks5://')):
+            parsed = urlparse(proxy)
+            return bool(parsed.hostname and parsed.port)
+        return False
+    except ValueError:
+        return False
+
+class WalletLoader:
+    """Parser wallets.txt satu pass (hash + parse sekaligus) + cache biner (sidecar) yang dipakai ulang selama hash file sama"""
+    MAGIC = b'PWW3'
+    HEADER = struct.Struct('<4s32sQQIII')
+    ENTRY = struct.Struct('<HHH')
+    
+    def __init__(self, path: str = 'wallets.txt', signers: Optional['SignerCache'] = None, on_invalid=None, max_reports: int = 20):
+        self.path = path
+        self.cache_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path) + '.cache')
+        self.signers = signers or SignerCache()
+        self.on_invalid = on_invalid
+        self.max_reports = max_reports
+        self.valid = 0
+        self.invalid = 0
+        self.proxy_warnings = 0
+        self.from_cache = False
+    
+    def report(self, message: str):
+        if self.on_invalid and self.invalid + self.proxy_warnings <= self.max_reports:
+            self.on_invalid(message)
+    
+    def file_stat(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    def file_digest(self) -> bytes:
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.digest()
+    
+    def lines(self, digest=None) -> Iterator[str]:
+        """Baca per chunk 1MB; hash di-update dari chunk yang sama dengan yang di-parse"""
+        tail = b''
+        with open(self.path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                if digest is not None:
+                    digest.update(chunk)
+                data = tail + chunk
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    tail = data
+                    continue
+                tail = data[cut + 1:]
+                yield from data[:cut].decode('utf-8').split('\n')
+        if tail:
+            yield tail.decode('utf-8')
+    
+    def parse(self, digest=None) -> Iterator[WalletRecord]:
+        for line_num, line in enumerate(self.lines(digest), 1):
+            line = line.strip()
+            if not line or line.startswith(';') or line.startswith('//'):
+                continue
+            parts = [p.strip() for p in line.split(',') if p.strip()]
+            if len(parts) < 2:
+                self.invalid += 1
+                self.report(f"Invalid format on line {line_num}")
+                continue
+            address, private_key = parts[0], parts[1]
+            if not address.startswith('0x') or len(address) != 42:
+                self.invalid += 1
+                self.report(f"Invalid address on line {line_num}: {address}")
+                continue
+            if not self.signers.preload(private_key):
+                self.invalid += 1
+                self.report(f"Invalid private key on line {line_num}")
+                continue
+            proxy = parts[2] if len(parts) >= 3 else None
+            if proxy and not is_valid_proxy(proxy):
+                self.proxy_warnings += 1
+                self.report(f"Invalid proxy format on line {line_num}")
+                proxy = None
+            self.valid += 1
+            yield WalletRecord(address, private_key, proxy, self.valid)
+    
+    def read_cache(self, stat: Tuple[int, int]) -> Optional[bytes]:
+        """Cache valid jika size/mtime sama (cek murah) dan hash isi file sama"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        magic, cached_digest, size, mtime_ns, _, _, _ = self.HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC or (size, mtime_ns) != stat or cached_digest != self.file_digest():
+            return None
+        return data
+    
+    def cached_records(self, data: bytes) -> Iterator[WalletRecord]:
+        _, _, _, _, valid, invalid, proxy_warnings = self.HEADER.unpack_from(data, 0)
+        self.valid, self.invalid, self.proxy_warnings = valid, invalid, proxy_warnings
+        offset = self.HEADER.size
+        for index in range(1, valid + 1):
+            lengths = self.ENTRY.unpack_from(data, offset)
+            offset += self.ENTRY.size
+            fields = []
+            for length in lengths:
+                fields.append(data[offset:offset + length].decode('utf-8'))
+                offset += length
+            yield WalletRecord(fields[0], fields[1], fields[2] or None, index)
+    
+    def open_cache(self):
+        try:
+            fd = os.open(self.cache_path + '.tmp', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            cache = os.fdopen(fd, 'wb')
+            cache.write(bytes(self.HEADER.size))
+            return cache
+        except OSError:
+            return None
+    
+    def write_entry(self, cache, record: WalletRecord):
+        fields = [record.address.encode(), record.private_key.encode(), (record.proxy or '').encode()]
+        try:
+            cache.write(self.ENTRY.pack(*map(len, fields)) + b''.join(fields))
+            return cache
+        except OSError:
+            cache.close()
+            return None
+    
+    def commit_cache(self, cache, digest: bytes, stat: Tuple[int, int]):
+        """Header (hash, stat, jumlah) baru diketahui setelah parse selesai, ditulis di akhir"""
+        try:
+            with cache:
+                cache.seek(0)
+                cache.write(self.HEADER.pack(self.MAGIC, digest, *stat, self.valid, self.invalid, self.proxy_warnings))
+            os.replace(self.cache_path + '.tmp', self.cache_path)
+        except OSError:
+            pass
+    
+    def load(self) -> Iterator[WalletRecord]:
+        stat = self.file_stat()
+        data = self.read_cache(stat)
+        if data is not None:
+            self.from_cache = True
+            yield from self.cached_records(data)
+            return
+        digest = hashlib.sha256()
+        cache = self.open_cache()
+        for record in self.parse(digest):
+            if cache:
+                cache = self.write_entry(cache, record)
+            yield record
+        if cache:
+            self.commit_cache(cache, digest.digest(), stat)
+
+class TransportPool:
+    """Pool koneksi keep-alive bersama per (host, proxy) dengan eviction LRU"""
+    def __init__(self, max_pools: int = 64, idle_timeout: float = 300, pool_maxsize: int = 10):
+        self.max_pools = max_pools
+        self.idle_timeout = idle_timeout
+        self.pool_maxsize = pool_maxsize
+        self.adapters = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get_adapter(self, url: str, proxy: Optional[str]):
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.netloc, proxy)
+        now_ts = time.monotonic()
+        with self.lock:
+            self.evict_idle(now_ts)
+            entry = self.adapters.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.adapters.move_to_end(key)
+                entry[1] = now_ts
+                return entry[0]
+            self.misses += 1
+            # retry koneksi saja; 429/503 + Retry-After ditangani make_intelligent_request (budget, rate limiter, pacing)
+            retries = requests.adapters.Retry(total=3, respect_retry_after_header=False)
+            adapter = requests.adapters.HTTPAdapter(max_retries=retries, pool_connections=1, pool_maxsize=self.pool_maxsize)
+            self.adapters[key] = [adapter, now_ts]
+            while len(self.adapters) > self.max_pools:
+                self._evict_oldest()
+            return adapter
+    
+    def evict_idle(self, now_ts: float):
+        while self.adapters:
+            _, last_used = next(iter(self.adapters.values()))
+            if now_ts - last_used < self.idle_timeout:
+                break
+            self._evict_oldest()
+    
+    def _evict_oldest(self):
+        _, (adapter, _) = self.adapters.popitem(last=False)
+        adapter.close()
+        self.evictions += 1
+    
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'pools': len(self.adapters), 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+    
+    def describe(self) -> str:
+        stats = self.stats()
+        return f"{stats['pools']} pools, {stats['hits']} hits / {stats['misses']} misses, {stats['evictions']} evicted"
+    
+    def close(self):
+        with self.lock:
+            for adapter, _ in self.adapters.values():
+                adapter.close()
+            self.adapters.clear()
+
+class PooledAdapter(requests.adapters.BaseAdapter):
+    """Adapter per session; koneksi diambil dari TransportPool bersama"""
+    def __init__(self, pool: TransportPool):
+        super().__init__()
+        self.pool = pool
+    
+    def send(self, request, **kwargs):
+        proxy = requests.utils.select_proxy(request.url, kwargs.get('proxies') or {})
+        return self.pool.get_adapter(request.url, proxy).send(request, **kwargs)
+    
+    def close(self):
+        pass
+
+class BufferedResponse:
+    """Response yang sudah dibaca penuh (dipakai mode async)"""
+    def __init__(self, status_code: int, headers, content: bytes, url: str = ''):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+    
+    def json(self):
+        return json.loads(self.content)
+
+class Cassette:
+    """Rekam/putar ulang response HTTP (JSON lines ter-gzip) untuk profiling tanpa API live"""
+    def __init__(self, path: str, mode: str = 'record', speed: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.fallback = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.file = None
+        if mode == 'record':
+            self.file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+            self.file.write(json.dumps({'cassette': 1, 'recorded_at': time.time()}) + '\n')
+            atexit.register(self.close)
+        else:
+            self.load()
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    @staticmethod
+    def entry_key(method: str, url: str, wallet_address: Optional[str]) -> Tuple:
+        """Key tanpa host, supaya cassette tetap cocok kalau base URL di-override"""
+        parsed = urlparse(url)
+        return method.upper(), f"{parsed.path}?{parsed.query}", (wallet_address or '').lower()
+    
+    def record(self, method: str, url: str, wallet_address: Optional[str], status: int, headers, content: bytes, elapsed: float):
+        entry = {'method': method.upper(), 'url': url, 'wallet': (wallet_address or '').lower(), 'status': status, 'headers': dict(headers), 'elapsed': round(elapsed, 4)}
+        try:
+            entry['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_b64'] = base64.b64encode(content).decode()
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            if self.file:
+                self.file.write(line)
+                self.recorded += 1
+    
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if 'method' not in entry:
+                    continue
+                self.entries.setdefault(self.entry_key(entry['method'], entry['url'], entry['wallet']), deque()).append(entry)
+                fallback_key = (entry['method'], endpoint_label(entry['url']))
+                if entry['status'] < 400 or fallback_key not in self.fallback:
+                    self.fallback[fallback_key] = entry
+    
+    def replay(self, method: str, url: str, wallet_address: Optional[str]) -> Tuple[BufferedResponse, float]:
+        """Returns (response, delay); urutan response per (method, url, wallet) sama seperti saat direkam"""
+        with self.lock:
+            pending = self.entries.get(self.entry_key(method, url, wallet_address))
+            if pending:
+                entry = pending.popleft() if len(pending) > 1 else pending[0]
+                self.replayed += 1
+            else:
+                entry = self.fallback.get((method.upper(), endpoint_label(url)))
+                self.misses += 1
+        if entry is None:
+            return BufferedResponse(404, requests.structures.CaseInsensitiveDict(), b'{}', url), 0.0
+        content = entry['body'].encode('utf-8') if 'body' in entry else base64.b64decode(entry['body_b64'])
+        response = BufferedResponse(entry['status'], requests.structures.CaseInsensitiveDict(entry['headers']), content, url)
+        return response, entry['elapsed'] * self.speed
+    
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+    
+    def describe(self) -> str:
+        if self.replaying:
+            return f"replayed {self.replayed} responses from {self.path} ({self.misses} unmatched)"
+        return f"recorded {self.recorded} responses to {self.path}"
+
+class WalletDeferred(BaseException):
+    """Wallet diparkir di scheduler; BaseException supaya tidak tertelan except Exception di tiap layer"""
+    def __init__(self, delay: float, reason: str = ''):
+        super().__init__(f"deferred {delay:.0f}s: {reason}")
+        self.delay = delay
+        self.reason = reason
+
+class RetryBudget:
+    """Budget waktu & request per wallet yang dipakai bersama semua layer retry"""
+    def __init__(self, deadline: float = 900, max_attempts: int = 60, max_deferrals: int = 0):
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline
+        self.max_attempts = max_attempts
+        self.max_deferrals = max_deferrals
+        self.attempts = 0
+        self.task_fetches = 0
+        self.deferrals = 0
+        self.parked_at = None
+        self.parked_time = 0.0
+        self.backoff_time = 0.0
+        self.reported = False
+    
+    @property
+    def deferrable(self) -> bool:
+        return self.deferrals < self.max_deferrals
+    
+    def park(self):
+        self.parked_at = time.monotonic()
+        self.deferrals += 1
+    
+    def resume(self):
+        if self.parked_at is not None:
+            parked = time.monotonic() - self.parked_at
+            self.deadline += parked
+            self.parked_time += parked
+            self.parked_at = None
+    
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started - self.parked_time
+    
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0 or self.attempts >= self.max_attempts
+    
+    def take_attempt(self) -> bool:
+        if self.exhausted():
+            return False
+        self.attempts += 1
+        return True
+    
+    def clamp(self, delay: float) -> float:
+        return min(delay, self.remaining())
+    
+    def clamp_timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            return tuple(max(0.1, self.clamp(t)) for t in timeout)
+        return max(0.1, self.clamp(timeout))
+    
+    def summary(self) -> str:
+        summary = f"{self.elapsed():.1f}s, {self.attempts}/{self.max_attempts} requests, {self.backoff_time:.1f}s backoff"
+        if self.deferrals:
+            summary += f", parked {self.deferrals}x ({self.parked_time:.0f}s)"
+        return summary
+
+class BackoffScheduler:
+    """Antrian prioritas (heapq) wallet berdasarkan waktu bangun"""
     def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.parked = 0
+        self.total_deferrals = 0
+    
+    def __len__(self) -> int:
+        return len(self.heap)
+    
+    def push(self, item, delay: float = 0.0):
+        with self.lock:
+            if delay > 0:
+                self.parked += 1
+                self.total_deferrals += 1
+            heapq.heappush(self.heap, (time.monotonic() + delay, delay > 0, next(self.counter), item))
+    
+    def pop_ready(self):
+        with self.lock:
+            if not self.heap or self.heap[0][0] > time.monotonic():
+                return None
+            _, was_parked, _, item = heapq.heappop(self.heap)
+            if was_parked:
+                self.parked -= 1
+            return item
+    
+    def next_wake(self) -> Optional[float]:
+        with self.lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - time.monotonic())
+    
+    def metrics(self) -> Dict:
+        next_wake = self.next_wake()
+        return {
+            'depth': len(self.heap),
+            'parked': self.parked,
+            'ready': len(self.heap) - self.parked,
+            'next_wake': next_wake if next_wake is not None else 0.0,
+            'total_deferrals': self.total_deferrals,
+        }
+    
+    def describe(self) -> str:
+        m = self.metrics()
+        return f"queue depth {m['depth']} ({m['parked']} parked), next wake in {m['next_wake']:.0f}s"
+
+class PrioritySlots:
+    """Semaphore asyncio dengan dua antrian FIFO; slot yang lepas diberikan ke antrian urgent lebih dulu"""
+    def __init__(self, size: int):
+        self.free = size
+        self.waiters = (deque(), deque())
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, urgent: bool = False):
+        if self.free > 0 and not any(self.waiters):
+            self.free -= 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.waiters[0 if urgent else 1].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.release()
+                raise
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def release(self):
+        for waiters in self.waiters:
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    future.set_result(None)
+                    return
+        self.free += 1
+
+class LoginPipeline:
+    """Pipeline login SIWE: nonce diambil paralel, signing di thread pool, authenticate begitu signature siap"""
+    def __init__(self, bot: 'PipWorldAutoTask', concurrency: int, max_nonce_age: float = 120, max_refetch: int = 2, signer_workers: int = 4):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.max_nonce_age = max_nonce_age
+        self.max_refetch = max_refetch
+        self.executor = ThreadPoolExecutor(max_workers=signer_workers, thread_name_prefix='siwe-signer')
+        self.nonces_fetched = 0
+        self.nonces_refetched = 0
+        self.logged_in = 0
+        self.failed = 0
+    
+    def nonce_is_stale(self, init_data: Dict, fetched_at: float) -> bool:
+        if time.monotonic() - fetched_at > self.max_nonce_age:
+            return True
+        expires_at = init_data.get('expires_at')
+        if expires_at:
+            try:
+                remaining = datetime.fromisoformat(expires_at.replace('Z', '+00:00')).timestamp() - time.time()
+                return remaining < 10
+            except ValueError:
+                return False
+        return False
+    
+    async def fetch_nonce(self, address: str, proxy, budget: RetryBudget):
+        init_data = await self.bot.init_siwe_async(address, proxy, budget)
+        self.nonces_fetched += 1
+        return init_data, time.monotonic()
+    
+    async def sign(self, wallet: WalletRecord, init_data) -> Optional[Tuple[str, str]]:
+        message = self.bot.build_siwe_message(wallet.address, init_data)
+        if not message:
+            return None
+        signature = await asyncio.get_running_loop().run_in_executor(self.executor, self.bot.sign_message, wallet.private_key, message)
+        return (message, signature) if signature else None
+    
+    async def login(self, wallet: WalletRecord, slots: PrioritySlots) -> Optional[Dict]:
+        address = wallet.address
+        proxy = wallet.proxy
+        async with slots.slot():
+            if self.bot.stopping:
+                return None
+            # budget mulai saat slot didapat, antrian tidak ikut memakan deadline login
+            budget = RetryBudget(min(self.bot.wallet_deadline, 120), 6)
+            init_data, fetched_at = await self.fetch_nonce(address, proxy, budget)
+        signed = await self.sign(wallet, init_data)
+        if not signed:
+            return None
+        # authenticate didahulukan dari fetch nonce baru; staleness dicek ulang tepat sebelum authenticate
+        async with slots.slot(urgent=True):
+            for refetch in range(self.max_refetch + 1):
+                if self.bot.stopping:
+                    return None
+                if not self.nonce_is_stale(init_data, fetched_at):
+                    return await self.bot.authenticate_siwe_async(address, *signed, proxy, budget)
+                if refetch == self.max_refetch:
+                    return None
+                self.nonces_refetched += 1
+                init_data, fetched_at = await self.fetch_nonce(address, proxy, budget)
+                signed = await self.sign(wallet, init_data)
+                if not signed:
+                    return None
+        return None
+    
+    async def login_wallet(self, wallet: WalletRecord, slots: PrioritySlots):
+        started = time.monotonic()
+        try:
+            with self.bot.span(wallet, 'login'):
+                result = await self.login(wallet, slots)
+        except Exception as e:
+            self.bot.print_color(f"Pipeline login error for {wallet.address[:10]}: {e}", "yellow", level="warning")
+            result = None
+        if result is None and self.bot.stopping:
+            return
+        success = self.bot.on_login_result(wallet.address, result, 1)
+        self.bot.record_login('pipeline', started, success)
+        if success:
+            self.logged_in += 1
+        else:
+            self.failed += 1
+    
+    async def run(self, wallets: List[WalletRecord]):
+        slots = PrioritySlots(self.concurrency)
+        try:
+            await asyncio.gather(*(self.login_wallet(wallet, slots) for wallet in wallets))
+        finally:
+            self.executor.shutdown(wait=False)
+    
+    def describe(self) -> str:
+        return f"{self.logged_in} logged in, {self.failed} left for full login, {self.nonces_fetched} nonces ({self.nonces_refetched} re-fetched)"
+
+class TokenRefresher:
+    """Re-login wallet yang tokennya akan expired sebelum cycle berikutnya, tersebar di jendela idle"""
+    def __init__(self, bot: 'PipWorldAutoTask', window: float = 7200, margin: float = 3600, lead: float = 60):
+        self.bot = bot
+        self.window = window
+        self.margin = margin
+        self.lead = lead
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.refreshed = 0
+        self.failed = 0
+    
+    def needs_refresh(self, wallet: WalletRecord, next_run: float) -> bool:
+        expires_at = self.bot.token_store.expires_at(wallet.address)
+        if expires_at is not None and expires_at >= next_run + self.margin:
+            return False
+        should_retry, wait_time = self.bot.session_manager.should_retry_login(wallet.address)
+        return should_retry and wait_time == 0
+    
+    def start(self, next_run: float):
+        if self.window <= 0 or not self.bot.wallets:
+            return
+        self.stop_event.clear()
+        self.refreshed = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self.run, args=(next_run, list(self.bot.wallets)), name='token-refresher', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        if self.refreshed or self.failed:
+            self.bot.print_color(f"Token refresher: {self.refreshed} wallets re-logged in ahead of the cycle, {self.failed} failed", "cyan")
+    
+    def refresh(self, wallet: WalletRecord) -> Optional[float]:
+        budget = RetryBudget(60, 6)
+        started = time.monotonic()
+        try:
+            result = self.bot.login_normal_flow(wallet.address, wallet.private_key, wallet.proxy, budget)
+        except Exception as e:
+            self.bot.print_color(f"Token refresh error for {wallet.address[:10]}: {e}", "yellow", level="warning")
+            result = None
+        success = self.bot.on_login_result(wallet.address, result, 1)
+        self.bot.record_login('refresher', started, success)
+        if not success:
+            self.failed += 1
+            return None
+        self.refreshed += 1
+        return self.bot.token_store.expires_at(wallet.address)
+    
+    def run(self, next_run: float, wallets: List[WalletRecord]):
+        due = [wallet for wallet in wallets if self.needs_refresh(wallet, next_run)]
+        if not due:
+            return
+        end = next_run - self.lead
+        start = max(time.time(), next_run - self.window)
+        self.bot.print_color(f"Token refresher: {len(due)} wallets to re-login before {datetime.fromtimestamp(next_run).strftime('%H:%M:%S')}", "cyan")
+        for i, wallet in enumerate(due):
+            at = start + (end - start) * i / len(due)
+            if self.stop_event.wait(max(0.0, at - time.time())):
+                return
+            if not self.needs_refresh(wallet, next_run):
+                continue
+            expires_at = self.refresh(wallet)
+            if expires_at is not None and expires_at < next_run + self.margin:
+                start = max(start, next_run + self.margin - (expires_at - time.time()))
+                if start >= end:
+                    self.bot.print_color("Token lifetime is too short to refresh ahead of the cycle, refresher stopped", "yellow", level="warning")
+                    return
+
+class PipWorldAutoTask:
+    def __init__(self, use_async: bool = False, concurrency: int = 1, wallet_deadline: float = 900, wallet_max_requests: int = 60, max_deferrals: int = 5, defer_threshold: float = 10, host_rates: Optional[Dict[str, Tuple[float, float]]] = None, daemon: bool = False, shards: int = 1, metrics_port: int = 0, log_level: str = 'info', log_file: Optional[str] = None, record: Optional[str] = None, replay: Optional[str] = None, replay_speed: float = 1.0, refresh_window: float = 7200, ineligible_ttl: float = 3 * 86400, profile_dir: Optional[str] = None):
         self.wallets = []
-        self.proxies = {}
-        self.session_manager = SessionManager()
+        self.cassette = Cassette(replay, 'replay', replay_speed) if replay else Cassette(record) if record else None
+        self.pacing = replay_speed if replay else 1.0
+        self.profiler = Profiler(profile_dir, self.pacing) if profile_dir else None
+        self.logger = Logger(log_level, json_stream=daemon, json_path=log_file)
+        self.metrics = Metrics()
+        self.metrics_port = metrics_port
+        self.daemon = daemon
+        self.drain_on_signal = daemon
+        self.shards = max(1, shards)
+        self.shard = None
+        self.shard_processes = []
+        self.cycle_stats = Counter()
+        self.pending_extras = {}
+        self.stopping = False
+        self.reload_requested = False
+        self.wake = threading.Event()
+        self.state_store = StateStore(':memory:' if replay else 'pipworld.db', logger=self.logger)
+        self.session_manager = SessionManager(self.state_store)
+        self.token_store = TokenStore(self.state_store)
+        self.journal = CycleJournal(self.state_store)
+        self.refresher = TokenRefresher(self, refresh_window)
         self.request_manager = SmartRequestManager()
-        self.results = []
+        self.rate_limiter = HostRateLimiter(host_rates)
+        self.signers = SignerCache()
+        self.results = ResultStore(self.state_store)
         self.sessions = {}
-        self.AUTO_CLAIMABLE_TASKS = [
+        self.transport = TransportPool(pool_maxsize=max(10, concurrency))
+        self.use_async = use_async
+        self.concurrency = max(1, concurrency)
+        self.options = {
+            'use_async': use_async, 'concurrency': concurrency, 'wallet_deadline': wallet_deadline,
+            'wallet_max_requests': wallet_max_requests, 'max_deferrals': max_deferrals,
+            'defer_threshold': defer_threshold, 'host_rates': host_rates, 'daemon': daemon,
+            'log_level': log_level, 'log_file': log_file, 'record': record, 'replay': replay, 'replay_speed': replay_speed,
+            'ineligible_ttl': ineligible_ttl, 'profile_dir': profile_dir,
+        }
+        self.wallet_deadline = wallet_deadline
+        self.wallet_max_requests = wallet_max_requests
+        self.max_deferrals = max_deferrals
+        self.defer_threshold = defer_threshold
+        self.async_sessions = {}
+        self.async_connector = None
+        self.async_socks_connectors = {}
+        self.AUTO_CLAIMABLE_TASKS = frozenset([
             "h8i9j0k1-l2m3-n4o5-p6q7-r8s9t0u1v2w3"
-        ]
-        self.SKIP_TASKS = [
+        ])
+        self.SKIP_TASKS = frozenset([
             "a1b2c3d4-e5f6-7g8h-9i0j-k1l2m3n4o5p6",
             "f7g8h9i0-j1k2-l3m4-n5o6-p7q8r9s0t1u2",
             "g1r2u3s4-h5x6-p7t8-a9s0-k1b2c3d4e5f6",
-        ]
+        ])
+        self.task_ledger = TaskLedger(self.state_store, self.AUTO_CLAIMABLE_TASKS, ineligible_ttl)
     
-    def print_color(self, text, color="white"):
-        colors = {
-            "red": "\033[91m",
-            "green": "\033[92m",
-            "yellow": "\033[93m",
-            "blue": "\033[94m",
-            "purple": "\033[95m",
-            "cyan": "\033[96m",
-            "white": "\033[97m",
-            "reset": "\033[0m"
-        }
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"{colors.get(color, colors['white'])}[{timestamp}] {text}{colors['reset']}")
+    def print_color(self, text, color="white", level="info"):
+        if self.shard and not self.daemon:
+            text = f"[shard {self.shard[0] + 1}/{self.shard[1]}] {text.lstrip()}"
+        self.logger.log(level, text, color)
+    
+    def emit_status(self, event: str, **fields):
+        self.logger.event(event, **fields)
+    
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.on_stop_signal)
+        signal.signal(signal.SIGINT, self.on_stop_signal)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.on_reload_signal)
+    
+    def on_stop_signal(self, signum, frame):
+        self.stopping = True
+        self.wake.set()
+        for process in self.shard_processes:
+            if process.pid and process.exitcode is None:
+                os.kill(process.pid, signal.SIGTERM)
+    
+    def on_reload_signal(self, signum, frame):
+        self.reload_requested = True
+        self.wake.set()
+    
+    def reload_wallets(self):
+        self.reload_requested = False
+        previous = self.wallets
+        if not self.load_wallets_and_proxies():
+            self.wallets = previous
+            self.print_color("Reload failed, keeping previous wallets", "red", level="error")
+        self.emit_status('reloaded', wallets=len(self.wallets))
+    
+    def wait_until(self, target_time: datetime):
+        """Tidur sampai target_time; hanya bangun kalau ada signal"""
+        self.emit_status('sleeping', until=target_time.isoformat(timespec='seconds'))
+        while not self.stopping:
+            remaining = (target_time - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return
+            self.wake.wait(remaining)
+            self.wake.clear()
+            if self.reload_requested:
+                self.reload_wallets()
+    
+    def wait_for_next_cycle(self, target_time: datetime):
+        self.refresher.start(target_time.timestamp())
+        try:
+            if self.daemon:
+                self.wait_until(target_time)
+            else:
+                self.countdown_timer(target_time, "Next cycle at")
+        finally:
+            self.refresher.stop()
     
     def load_wallets_and_proxies(self) -> bool:
-        loaded_count = 0
-        try:
-            with open('wallets.txt', 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line or line.startswith(';') or line.startswith('//'):
-                        continue
-                    parts = [p.strip() for p in line.split(',') if p.strip()]
-                    if len(parts) >= 2:
-                        address = parts[0]
-                        private_key = parts[1]
-                        if not address.startswith('0x') or len(address) != 42:
-                            self.print_color(f"Invalid address on line {line_num}: {address}", "yellow")
-                            continue
-                        proxy = None
-                        if len(parts) >= 3:
-                            proxy = parts[2]
-                            if proxy and not self.validate_proxy_format(proxy):
-                                self.print_color(f"Invalid proxy format on line {line_num}", "yellow")
-                                proxy = None
-                        self.wallets.append({
-                            'address': address,
-                            'private_key': private_key,
-                            'proxy': proxy,
-                            'index': len(self.wallets) + 1
-                        })
-                        if proxy:
-                            self.proxies[address.lower()] = proxy
-                        loaded_count += 1
-                    else:
-                        self.print_color(f"Invalid format on line {line_num}", "yellow")
-            self.print_color(f"Successfully loaded {loaded_count}/{len(self.wallets)} wallets", "green")
-            if self.proxies:
-                self.print_color(f"Loaded {len(self.proxies)} proxies", "green")
+        try:
+            loader = WalletLoader('wallets.txt', self.signers, on_invalid=lambda message: self.print_color(message, "yellow", level="warning"))
+            self.wallets = list(loader.load())
+            source = "cache" if loader.from_cache else "wallets.txt"
+            self.print_color(f"Successfully loaded {loader.valid} wallets from {source} ({loader.invalid} invalid lines skipped)", "green")
+            if loader.proxy_warnings:
+                self.print_color(f"{loader.proxy_warnings} wallets have an invalid proxy and will connect directly", "yellow", level="warning")
+            proxy_count = sum(1 for wallet in self.wallets if wallet.proxy)
+            if proxy_count:
+                self.print_color(f"Loaded {proxy_count} proxies", "green")
             return len(self.wallets) > 0
         except FileNotFoundError:
-            self.print_color("File wallets.txt not found", "red")
+            self.print_color("File wallets.txt not found", "red", level="error")
             return False
         except Exception as e:
-            self.print_color(f"Error loading wallets: {e}", "red")
+            self.print_color(f"Error loading wallets: {e}", "red", level="error")
             return False
     
     def validate_proxy_format(self, proxy: str) -> bool:
-        try:
-            if proxy.startswith(('http://', 'https://', 'socks4://', 'socks5://')):
-                parsed = urlparse(proxy)
-                return bool(parsed.hostname and parsed.port)
-            return False
-        except:
-            return False
+        return is_valid_proxy(proxy)
     
-    def get_session_for_wallet(self, address: str):
+    def get_session_for_wallet(self, address: Optional[str]):
         if address not in self.sessions:
             session = requests.Session()
-            session.headers.update({
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-site',
-            })
-            adapter = requests.adapters.HTTPAdapter(max_retries=3, pool_connections=10, pool_maxsize=10)
+            session.headers.update(DEFAULT_SESSION_HEADERS)
+            adapter = PooledAdapter(self.transport)
             session.mount('https://', adapter)
             session.mount('http://', adapter)
+            if address is None:
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
             self.sessions[address] = session
         return self.sessions[address]
     
-    def make_intelligent_request(self, method, url, wallet_address=None, max_retries=5, **kwargs):
-        session = self.get_session_for_wallet(wallet_address) if wallet_address else requests.Session()
-        proxy = kwargs.pop('proxy', None)
+    def get_async_connector(self):
+        if self.async_connector is None or self.async_connector.closed:
+            self.async_connector = aiohttp.TCPConnector(limit=self.concurrency * 4, limit_per_host=self.concurrency * 2)
+        return self.async_connector
+    
+    def get_async_session_for_wallet(self, address: Optional[str], proxy=None):
+        socks_proxy = proxy if proxy and proxy.startswith('socks') else None
+        key = (address, socks_proxy)
+        if key not in self.async_sessions:
+            if socks_proxy:
+                if socks_proxy not in self.async_socks_connectors:
+                    self.async_socks_connectors[socks_proxy] = ProxyConnector.from_url(socks_proxy, limit=self.concurrency * 2)
+                connector = self.async_socks_connectors[socks_proxy]
+            else:
+                connector = self.get_async_connector()
+            cookie_jar = aiohttp.DummyCookieJar() if address is None else None
+            session = aiohttp.ClientSession(connector=connector, connector_owner=False, cookie_jar=cookie_jar)
+            session.headers.update(DEFAULT_SESSION_HEADERS)
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+            self.async_sessions[key] = session
+        return self.async_sessions[key]
+    
+    async def close_async_sessions(self):
+        for session in self.async_sessions.values():
+            await session.close()
+        self.async_sessions.clear()
+        for connector in self.async_socks_connectors.values():
+            await connector.close()
+        self.async_socks_connectors.clear()
+        if self.async_connector is not None:
+            await self.async_connector.close()
+            self.async_connector = None
+    
+    def backoff_sleep(self, delay: float, budget: Optional[RetryBudget] = None):
+        if budget:
+            delay = budget.clamp(delay)
+            budget.backoff_time += delay
+        if delay > 0:
+            self.metrics.inc('pipworld_backoff_seconds_total', delay)
+            time.sleep(delay * self.pacing)
+    
+    async def backoff_sleep_async(self, delay: float, budget: Optional[RetryBudget] = None):
+        if budget:
+            delay = budget.clamp(delay)
+            budget.backoff_time += delay
+        if delay > 0:
+            self.metrics.inc('pipworld_backoff_seconds_total', delay)
+            await asyncio.sleep(delay * self.pacing)
+    
+    def defer_or_sleep(self, delay: float, budget: Optional[RetryBudget], reason: str, min_defer: Optional[float] = None):
+        if budget and budget.deferrable and delay >= (self.defer_threshold if min_defer is None else min_defer):
+            raise WalletDeferred(delay, reason)
+        self.backoff_sleep(delay, budget)
+    
+    async def defer_or_sleep_async(self, delay: float, budget: Optional[RetryBudget], reason: str, min_defer: Optional[float] = None):
+        if budget and budget.deferrable and delay >= (self.defer_threshold if min_defer is None else min_defer):
+            raise WalletDeferred(delay, reason)
+        await self.backoff_sleep_async(delay, budget)
+    
+    def budget_exhausted(self, budget: Optional[RetryBudget]) -> bool:
+        if budget and budget.exhausted():
+            if not budget.reported:
+                self.print_color(f"Retry budget exhausted ({budget.summary()})", "red", level="error")
+                budget.reported = True
+            return True
+        return False
+    
+    def get_retry_delay(self, url: str, wallet_address, attempt: int, max_retries: int) -> float:
+        endpoint = url.split('/')[-1] if '/' in url else url
+        delay = self.request_manager.get_adaptive_delay(wallet_address or 'global', endpoint)
+        delay *= (attempt + 1)
+        self.print_color(f"Retry {attempt}/{max_retries-1} in {delay:.1f}s...", "yellow", level="warning")
+        return delay
+    
+    def throttle(self, host: str, budget: Optional[RetryBudget]) -> bool:
+        while True:
+            wait = self.rate_limiter.reserve(host)
+            if wait <= 0:
+                return True
+            if self.budget_exhausted(budget):
+                return False
+            self.defer_or_sleep(wait, budget, f"{host} rate limit")
+    
+    async def throttle_async(self, host: str, budget: Optional[RetryBudget]) -> bool:
+        while True:
+            wait = self.rate_limiter.reserve(host)
+            if wait <= 0:
+                return True
+            if self.budget_exhausted(budget):
+                return False
+            await self.defer_or_sleep_async(wait, budget, f"{host} rate limit")
+    
+    def record_request(self, host: str, endpoint: str, status, started: Optional[float]):
+        self.metrics.inc('pipworld_http_requests_total', host=host, endpoint=endpoint, status=status)
+        if started is not None:
+            self.metrics.observe('pipworld_http_request_duration_seconds', time.monotonic() - started, host=host, endpoint=endpoint)
+    
+    def record_login(self, strategy: str, started: float, success: bool):
+        self.metrics.inc('pipworld_login_total', strategy=strategy, result='success' if success else 'failed')
+        self.metrics.observe('pipworld_login_duration_seconds', time.monotonic() - started, strategy=strategy)
+    
+    def record_operation(self, operation: str, started: float, result: str):
+        self.metrics.inc('pipworld_task_operations_total', operation=operation, result=result)
+        self.metrics.observe('pipworld_task_operation_duration_seconds', time.monotonic() - started, operation=operation)
+    
+    def get_retry_plan(self, response, attempt: int, proxy, host: str) -> Tuple[bool, float, Optional[str]]:
+        """Returns (retry, wait_time, proxy) untuk status response"""
+        status = response.status_code
+        if status == 429:
+            pause = min(300, parse_retry_after(response.headers.get('Retry-After')))
+            self.rate_limiter.pause(host, pause)
+            self.print_color(f"Rate limited, pausing {host} for {pause:.0f}s...", "yellow", level="warning")
+            return True, 0, proxy
+        if status == 401:
+            self.print_color("Session expired, will re-login", "yellow", level="warning")
+            return False, 0, proxy
+        if status >= 500:
+            wait_time = min(120, 10 * (attempt + 1))
+            self.print_color(f"Server error {status}, waiting {wait_time}s...", "yellow", level="warning")
+            return True, wait_time, proxy
+        if status == 403:
+            if proxy:
+                self.request_manager.mark_proxy_failure(proxy)
+                self.print_color("Proxy blocked, marking as unhealthy", "yellow", level="warning")
+                proxy = None
+            wait_time = 30 * (attempt + 1)
+            self.print_color(f"Access forbidden, waiting {wait_time}s...", "yellow", level="warning")
+            return True, wait_time, proxy
+        return False, 0, proxy
+    
+    def check_request_proxy(self, proxy):
         if proxy and not self.request_manager.is_proxy_healthy(proxy):
-            self.print_color(f"Proxy {proxy[:50]}... marked as unhealthy, trying without", "yellow")
-            proxy = None
+            self.print_color(f"Proxy {proxy[:50]}... marked as unhealthy, trying without", "yellow", level="warning")
+            return None
+        return proxy
+    
+    def make_intelligent_request(self, method, url, wallet_address=None, max_retries=5, budget=None, **kwargs):
+        session = self.get_session_for_wallet(wallet_address)
+        proxy = self.check_request_proxy(kwargs.pop('proxy', None))
+        timeout = kwargs.pop('timeout', (15, 30))
+        host = urlparse(url).hostname
+        endpoint = endpoint_label(url)
         for attempt in range(max_retries):
+            started = None
             try:
                 if attempt > 0:
-                    endpoint = url.split('/')[-1] if '/' in url else url
-                    delay = self.request_manager.get_adaptive_delay(wallet_address or 'global', endpoint)
-                    delay *= (attempt + 1)
-                    self.print_color(f"Retry {attempt}/{max_retries-1} in {delay:.1f}s...", "yellow")
-                    time.sleep(delay)
+                    self.metrics.inc('pipworld_http_retries_total', host=host)
+                    self.defer_or_sleep(self.get_retry_delay(url, wallet_address, attempt, max_retries), budget, f"retry {attempt}")
+                if budget and not budget.take_attempt():
+                    self.budget_exhausted(budget)
+                    return None
+                if not self.throttle(host, budget):
+                    return None
                 if proxy:
                     kwargs['proxies'] = {'http': proxy, 'https': proxy}
-                if 'timeout' not in kwargs:
-                    kwargs['timeout'] = (15, 30)
-                response = session.request(method, url, **kwargs)
-                if response.status_code == 429:
-                    retry_after = response.headers.get('Retry-After', 60)
-                    wait_time = min(300, int(retry_after) * (attempt + 1))
-                    self.print_color(f"Rate limited, waiting {wait_time}s...", "yellow")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code == 401:
-                    self.print_color("Session expired, will re-login", "yellow")
+                else:
+                    kwargs.pop('proxies', None)
+                started = time.monotonic()
+                if self.cassette and self.cassette.replaying:
+                    response, delay = self.cassette.replay(method, url, wallet_address)
+                    time.sleep(delay)
+                else:
+                    response = session.request(method, url, timeout=budget.clamp_timeout(timeout) if budget else timeout, **kwargs)
+                    if self.cassette:
+                        self.cassette.record(method, url, wallet_address, response.status_code, response.headers, response.content, time.monotonic() - started)
+                self.record_request(host, endpoint, response.status_code, started)
+                retry, wait_time, proxy = self.get_retry_plan(response, attempt, proxy, host)
+                if not retry:
                     return response
-                elif response.status_code >= 500:
-                    wait_time = min(120, 10 * (attempt + 1))
-                    self.print_color(f"Server error {response.status_code}, waiting {wait_time}s...", "yellow")
-                    time.sleep(wait_time)
-                    continue
-                elif response.status_code == 403:
-                    if proxy:
-                        self.request_manager.mark_proxy_failure(proxy)
-                        self.print_color("Proxy blocked, marking as unhealthy", "yellow")
-                        proxy = None
-                        kwargs.pop('proxies', None)
-                    wait_time = 30 * (attempt + 1)
-                    self.print_color(f"Access forbidden, waiting {wait_time}s...", "yellow")
-                    time.sleep(wait_time)
-                    continue
-                return response
+                self.defer_or_sleep(wait_time, budget, f"HTTP {response.status_code}")
+                continue
             except requests.exceptions.ProxyError as e:
+                self.record_request(host, endpoint, 'proxy_error', started)
                 if proxy:
                     self.request_manager.mark_proxy_failure(proxy)
-                    self.print_color(f"Proxy error: {e}", "yellow")
+                    self.print_color(f"Proxy error: {e}", "yellow", level="warning")
                     proxy = None
-                    kwargs.pop('proxies', None)
                 continue
             except requests.exceptions.ConnectionError as e:
+                self.record_request(host, endpoint, 'connection_error', started)
                 wait_time = min(60, 5 * (attempt + 1))
-                self.print_color(f"Connection error: {e}", "yellow")
-                time.sleep(wait_time)
+                self.print_color(f"Connection error: {e}", "yellow", level="warning")
+                self.defer_or_sleep(wait_time, budget, "connection error")
                 continue
             except requests.exceptions.Timeout as e:
+                self.record_request(host, endpoint, 'timeout', started)
+                wait_time = min(60, 10 * (attempt + 1))
+                self.print_color(f"Timeout: {e}", "yellow", level="warning")
+                self.defer_or_sleep(wait_time, budget, "timeout")
+                continue
+            except Exception as e:
+                self.record_request(host, endpoint, 'error', started)
+                self.print_color(f"Request error: {e}", "yellow", level="warning")
+                if attempt == max_retries - 1:
+                    raise
+        return None
+    
+    async def make_intelligent_request_async(self, method, url, wallet_address=None, max_retries=5, budget=None, **kwargs):
+        load_async_deps()
+        proxy = self.check_request_proxy(kwargs.pop('proxy', None))
+        if proxy and proxy.startswith('socks') and ProxyConnector is None:
+            self.print_color("SOCKS proxy needs aiohttp-socks in async mode, trying without", "yellow", level="warning")
+            proxy = None
+        timeout = kwargs.pop('timeout', (15, 30))
+        host = urlparse(url).hostname
+        endpoint = endpoint_label(url)
+        for attempt in range(max_retries):
+            started = None
+            try:
+                if attempt > 0:
+                    self.metrics.inc('pipworld_http_retries_total', host=host)
+                    await self.defer_or_sleep_async(self.get_retry_delay(url, wallet_address, attempt, max_retries), budget, f"retry {attempt}")
+                if budget and not budget.take_attempt():
+                    self.budget_exhausted(budget)
+                    return None
+                if not await self.throttle_async(host, budget):
+                    return None
+                session = self.get_async_session_for_wallet(wallet_address, proxy)
+                http_proxy = proxy if proxy and not proxy.startswith('socks') else None
+                attempt_timeout = budget.clamp_timeout(timeout) if budget else timeout
+                if isinstance(attempt_timeout, tuple):
+                    client_timeout = aiohttp.ClientTimeout(sock_connect=attempt_timeout[0], sock_read=attempt_timeout[1])
+                else:
+                    client_timeout = aiohttp.ClientTimeout(total=attempt_timeout)
+                started = time.monotonic()
+                if self.cassette and self.cassette.replaying:
+                    response, delay = self.cassette.replay(method, url, wallet_address)
+                    await asyncio.sleep(delay)
+                else:
+                    async with session.request(method, url, proxy=http_proxy, timeout=client_timeout, **kwargs) as resp:
+                        response = BufferedResponse(resp.status, resp.headers, await resp.read(), str(resp.url))
+                    if self.cassette:
+                        self.cassette.record(method, url, wallet_address, response.status_code, response.headers, response.content, time.monotonic() - started)
+                self.record_request(host, endpoint, response.status_code, started)
+                retry, wait_time, proxy = self.get_retry_plan(response, attempt, proxy, host)
+                if not retry:
+                    return response
+                await self.defer_or_sleep_async(wait_time, budget, f"HTTP {response.status_code}")
+                continue
+            except aiohttp.ClientProxyConnectionError as e:
+                self.record_request(host, endpoint, 'proxy_error', started)
+                if proxy:
+                    self.request_manager.mark_proxy_failure(proxy)
+                    self.print_color(f"Proxy error: {e}", "yellow", level="warning")
+                    proxy = None
+                continue
+            except aiohttp.ClientConnectionError as e:
+                self.record_request(host, endpoint, 'connection_error', started)
+                wait_time = min(60, 5 * (attempt + 1))
+                self.print_color(f"Connection error: {e}", "yellow", level="warning")
+                await self.defer_or_sleep_async(wait_time, budget, "connection error")
+                continue
+            except asyncio.TimeoutError as e:
+                self.record_request(host, endpoint, 'timeout', started)
                 wait_time = min(60, 10 * (attempt + 1))
-                self.print_color(f"Timeout: {e}", "yellow")
-                time.sleep(wait_time)
+                self.print_color(f"Timeout: {e!r}", "yellow", level="warning")
+                await self.defer_or_sleep_async(wait_time, budget, "timeout")
                 continue
             except Exception as e:
-                self.print_color(f"Request error: {e}", "yellow")
+                self.record_request(host, endpoint, 'error', started)
+                self.print_color(f"Request error: {e}", "yellow", level="warning")
                 if attempt == max_retries - 1:
                     raise
         return None
     
-    def smart_login(self, wallet: Dict) -> Optional[Dict]:
-        address = wallet['address']
-        private_key = wallet['private_key']
-        proxy = wallet.get('proxy')
+    def get_login_backoff(self, address: str, budget: Optional[RetryBudget] = None) -> Tuple[bool, int]:
         should_retry, wait_time = self.session_manager.should_retry_login(address)
         if not should_retry:
-            self.print_color(f"Too many failures for {address[:10]}, skipping...", "red")
-            return None
-        if wait_time > 0:
-            self.print_color(f"Waiting {wait_time}s before login (exponential backoff)...", "yellow")
-            time.sleep(wait_time)
-        saved_token = self.load_saved_token(address)
-        if saved_token:
-            self.print_color(f"Trying saved token for {address[:10]}...", "cyan")
-            if self.verify_token(saved_token, proxy):
-                self.print_color("Saved token still valid!", "green")
+            self.print_color(f"Too many failures for {address[:10]}, skipping...", "red", level="error")
+        elif budget and wait_time >= budget.remaining():
+            self.print_color(f"Login backoff {wait_time}s exceeds wallet budget, skipping...", "red", level="error")
+            return False, wait_time
+        elif wait_time > 0:
+            self.print_color(f"Login backoff {wait_time}s (exponential backoff)...", "yellow", level="warning")
+        return should_retry, wait_time
+    
+    def on_saved_token_valid(self, address: str, saved_token: str) -> Dict:
+        self.print_color("Saved token still valid!", "green")
+        self.session_manager.update_session(address, {
+            'last_success': datetime.now().isoformat(),
+            'login_attempts': 0,
+            'token': saved_token
+        })
+        return {'token': saved_token, 'user_id': 'from_saved'}
+    
+    def on_login_result(self, address: str, result: Optional[Dict], strategy_num: int) -> bool:
+        if result and result.get('success'):
+            token = result.get('token')
+            user_id = result.get('user_id')
+            if token:
+                self.save_token(address, user_id, token)
                 self.session_manager.update_session(address, {
                     'last_success': datetime.now().isoformat(),
                     'login_attempts': 0,
-                    'token': saved_token
+                    'token': token,
+                    'strategy_used': f'strategy_{strategy_num}'
                 })
-                return {'token': saved_token, 'user_id': 'from_saved'}
+                self.print_color(f"Login successful with strategy {strategy_num}!", "green")
+                return True
+        return False
+    
+    def on_all_strategies_failed(self, address: str):
+        self.print_color(f"All login strategies failed for {address[:10]}", "red", level="error")
+        self.session_manager.increment_failures(address)
+    
+    def smart_login(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        address = wallet.address
+        private_key = wallet.private_key
+        proxy = wallet.proxy
+        should_retry, wait_time = self.get_login_backoff(address, budget)
+        if not should_retry:
+            return None
+        if wait_time > 0:
+            self.defer_or_sleep(wait_time, budget, "login backoff", min_defer=0)
+        saved_token, needs_verify = self.token_store.lookup(address)
+        if saved_token and not needs_verify:
+            self.print_color(f"Saved token for {address[:10]} valid (local exp check)", "cyan")
+            self.metrics.inc('pipworld_login_total', strategy='saved_token_local', result='success')
+            return self.on_saved_token_valid(address, saved_token)
+        if saved_token:
+            self.print_color(f"Trying saved token for {address[:10]}...", "cyan")
+            started = time.monotonic()
+            valid = self.verify_token(saved_token, proxy, budget)
+            self.record_login('saved_token_verify', started, valid)
+            if valid:
+                return self.on_saved_token_valid(address, saved_token)
         self.print_color(f"Starting login for {address[:10]}...", "cyan")
         login_strategies = [self.login_normal_flow, self.login_with_different_headers, self.login_with_delayed_retry]
         for strategy_num, strategy in enumerate(login_strategies, 1):
+            if self.budget_exhausted(budget):
+                break
             self.print_color(f"Trying strategy {strategy_num}/{len(login_strategies)}...", "blue")
-            result = strategy(address, private_key, proxy)
-            if result and result.get('success'):
-                token = result.get('token')
-                user_id = result.get('user_id')
-                if token:
-                    self.save_token(address, user_id, token)
-                    self.session_manager.update_session(address, {
-                        'last_success': datetime.now().isoformat(),
-                        'login_attempts': 0,
-                        'token': token,
-                        'strategy_used': f'strategy_{strategy_num}'
-                    })
-                    self.print_color(f"Login successful with strategy {strategy_num}!", "green")
-                    return result
+            started = time.monotonic()
+            result = strategy(address, private_key, proxy, budget)
+            success = self.on_login_result(address, result, strategy_num)
+            self.record_login(strategy.__name__.replace('_async', ''), started, success)
+            if success:
+                return result
             if strategy_num < len(login_strategies):
                 delay = random.uniform(5, 10)
-                self.print_color(f"Strategy {strategy_num} failed, trying next in {delay:.1f}s...", "yellow")
-                time.sleep(delay)
-        self.print_color(f"All login strategies failed for {address[:10]}", "red")
-        self.session_manager.increment_failures(address)
+                self.print_color(f"Strategy {strategy_num} failed, trying next in {delay:.1f}s...", "yellow", level="warning")
+                self.backoff_sleep(delay, budget)
+        self.on_all_strategies_failed(address)
+        return None
+    
+    async def smart_login_async(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        address = wallet.address
+        private_key = wallet.private_key
+        proxy = wallet.proxy
+        should_retry, wait_time = self.get_login_backoff(address, budget)
+        if not should_retry:
+            return None
+        if wait_time > 0:
+            await self.defer_or_sleep_async(wait_time, budget, "login backoff", min_defer=0)
+        saved_token, needs_verify = self.token_store.lookup(address)
+        if saved_token and not needs_verify:
+            self.print_color(f"Saved token for {address[:10]} valid (local exp check)", "cyan")
+            self.metrics.inc('pipworld_login_total', strategy='saved_token_local', result='success')
+            return self.on_saved_token_valid(address, saved_token)
+        if saved_token:
+            self.print_color(f"Trying saved token for {address[:10]}...", "cyan")
+            started = time.monotonic()
+            valid = await self.verify_token_async(saved_token, proxy, budget)
+            self.record_login('saved_token_verify', started, valid)
+            if valid:
+                return self.on_saved_token_valid(address, saved_token)
+        self.print_color(f"Starting login for {address[:10]}...", "cyan")
+        login_strategies = [self.login_normal_flow_async, self.login_with_different_headers_async, self.login_with_delayed_retry_async]
+        for strategy_num, strategy in enumerate(login_strategies, 1):
+            if self.budget_exhausted(budget):
+                break
+            self.print_color(f"Trying strategy {strategy_num}/{len(login_strategies)}...", "blue")
+            started = time.monotonic()
+            result = await strategy(address, private_key, proxy, budget)
+            success = self.on_login_result(address, result, strategy_num)
+            self.record_login(strategy.__name__.replace('_async', ''), started, success)
+            if success:
+                return result
+            if strategy_num < len(login_strategies):
+                delay = random.uniform(5, 10)
+                self.print_color(f"Strategy {strategy_num} failed, trying next in {delay:.1f}s...", "yellow", level="warning")
+                await self.backoff_sleep_async(delay, budget)
+        self.on_all_strategies_failed(address)
         return None
     
-    def login_normal_flow(self, address: str, private_key: str, proxy=None) -> Optional[Dict]:
+    def login_normal_flow(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
         try:
-            init_data = self.init_siwe(address, proxy)
-            if not init_data:
+            init_data = self.init_siwe(address, proxy, budget)
+            message = self.build_siwe_message(address, init_data)
+            if not message:
                 return None
-            nonce = init_data.get('nonce')
-            issued_at = init_data.get('issued_at') or init_data.get('expires_at')
-            if not nonce or not issued_at:
+            signature = self.sign_message(private_key, message)
+            if not signature:
+                return None
+            auth_result = self.authenticate_siwe(address, message, signature, proxy, budget)
+            if auth_result and auth_result.get('success'):
+                return auth_result
+            return None
+        except Exception as e:
+            self.print_color(f"Normal login error: {e}", "yellow", level="warning")
+            return None
+    
+    async def login_normal_flow_async(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
+        try:
+            init_data = await self.init_siwe_async(address, proxy, budget)
+            message = self.build_siwe_message(address, init_data)
+            if not message:
                 return None
-            message = self.create_siwe_message(address, nonce, issued_at)
             signature = self.sign_message(private_key, message)
             if not signature:
                 return None
-            auth_result = self.authenticate_siwe(address, message, signature, proxy)
+            auth_result = await self.authenticate_siwe_async(address, message, signature, proxy, budget)
             if auth_result and auth_result.get('success'):
                 return auth_result
             return None
         except Exception as e:
-            self.print_color(f"Normal login error: {e}", "yellow")
+            self.print_color(f"Normal login error: {e}", "yellow", level="warning")
             return None
     
-    def login_with_different_headers(self, address: str, private_key: str, proxy=None) -> Optional[Dict]:
+    def login_with_different_headers(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
         try:
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
-                'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X) AppleWebKit/537.36'
-            ]
-            for ua in user_agents:
+            for ua in LOGIN_USER_AGENTS:
+                if self.budget_exhausted(budget):
+                    break
                 self.print_color(f"Trying User-Agent: {ua[:50]}...", "blue")
                 session = self.get_session_for_wallet(address)
                 session.headers.update({'User-Agent': ua})
-                result = self.login_normal_flow(address, private_key, proxy)
+                result = self.login_normal_flow(address, private_key, proxy, budget)
+                if result:
+                    return result
+                self.backoff_sleep(2, budget)
+            return None
+        except Exception as e:
+            self.print_color(f"Alternative headers error: {e}", "yellow", level="warning")
+            return None
+    
+    async def login_with_different_headers_async(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
+        try:
+            for ua in LOGIN_USER_AGENTS:
+                if self.budget_exhausted(budget):
+                    break
+                self.print_color(f"Trying User-Agent: {ua[:50]}...", "blue")
+                session = self.get_async_session_for_wallet(address, proxy)
+                session.headers['User-Agent'] = ua
+                result = await self.login_normal_flow_async(address, private_key, proxy, budget)
                 if result:
                     return result
-                time.sleep(2)
+                await self.backoff_sleep_async(2, budget)
             return None
         except Exception as e:
-            self.print_color(f"Alternative headers error: {e}", "yellow")
+            self.print_color(f"Alternative headers error: {e}", "yellow", level="warning")
             return None
     
-    def login_with_delayed_retry(self, address: str, private_key: str, proxy=None) -> Optional[Dict]:
+    def get_delayed_retry_wait(self, retry: int, max_retries: int) -> int:
+        self.print_color(f"Delayed retry {retry+1}/{max_retries}...", "blue")
+        if retry == 0:
+            return 0
+        delay = min(10 * (2 ** retry), 60)
+        self.print_color(f"Waiting {delay}s before retry...", "yellow", level="warning")
+        return delay
+    
+    def login_with_delayed_retry(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
+        max_retries = 3
+        for retry in range(max_retries):
+            if self.budget_exhausted(budget):
+                break
+            delay = self.get_delayed_retry_wait(retry, max_retries)
+            if delay:
+                self.defer_or_sleep(delay, budget, "delayed login retry")
+            result = self.login_normal_flow(address, private_key, proxy, budget)
+            if result:
+                return result
+        return None
+    
+    async def login_with_delayed_retry_async(self, address: str, private_key: str, proxy=None, budget=None) -> Optional[Dict]:
         max_retries = 3
-        base_delay = 10
         for retry in range(max_retries):
-            self.print_color(f"Delayed retry {retry+1}/{max_retries}...", "blue")
-            if retry > 0:
-                delay = base_delay * (2 ** retry)
-                delay = min(delay, 60)
-                self.print_color(f"Waiting {delay}s before retry...", "yellow")
-                time.sleep(delay)
-            result = self.login_normal_flow(address, private_key, proxy)
+            if self.budget_exhausted(budget):
+                break
+            delay = self.get_delayed_retry_wait(retry, max_retries)
+            if delay:
+                await self.defer_or_sleep_async(delay, budget, "delayed login retry")
+            result = await self.login_normal_flow_async(address, private_key, proxy, budget)
             if result:
                 return result
         return None
     
     def load_saved_token(self, address: str) -> Optional[str]:
-        try:
-            if not os.path.exists('tokens'):
-                return None
-            token_files = [f for f in os.listdir('tokens') if f.startswith(address[:10])]
-            if not token_files:
-                return None
-            latest_file = max(token_files, key=lambda x: int(x.split('_')[-1].replace('.txt', '')))
-            with open(f'tokens/{latest_file}', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                saved_at = datetime.fromisoformat(data.get('saved_at', '2000-01-01'))
-                age_hours = (datetime.now() - saved_at).total_seconds() / 3600
-                if age_hours < 12:
-                    return data.get('token')
-            return None
-        except:
-            return None
+        return self.token_store.get(address)
     
     def save_token(self, address: str, user_id: str, token: str):
         try:
-            os.makedirs('tokens', exist_ok=True)
-            timestamp = int(time.time())
-            filename = f"tokens/{address[:10]}_{timestamp}.txt"
-            data = {
-                'address': address,
-                'user_id': user_id,
-                'token': token,
-                'saved_at': datetime.now().isoformat(),
-                'version': '2.0'
-            }
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            with open('tokens_all.txt', 'a', encoding='utf-8') as f:
-                f.write(f"{address},{user_id},{token},{timestamp}\n")
+            self.token_store.put(address, user_id, token)
             return True
         except Exception as e:
-            self.print_color(f"Error saving token: {e}", "yellow")
+            self.print_color(f"Error saving token: {e}", "yellow", level="warning")
             return False
     
-    def verify_token(self, token: str, proxy=None) -> bool:
+    def verify_token(self, token: str, proxy=None, budget=None) -> bool:
         try:
-            url = "https://api-mm.pip.world/account"
+            url = f"{API_BASE_URL}/account"
             headers = {'Accept': 'application/json, text/plain, */*', 'Cookie': f'privy-token={token}'}
-            response = self.make_intelligent_request('GET', url, headers=headers, timeout=10, proxy=proxy)
+            response = self.make_intelligent_request('GET', url, headers=headers, timeout=10, proxy=proxy, budget=budget)
             return response is not None and response.status_code == 200
-        except:
+        except Exception:
             return False
     
-    def init_siwe(self, address, proxy=None):
-        try:
-            url = "https://privy.pip.world/api/v1/siwe/init"
-            headers = {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'Origin': 'https://mm.pip.world',
-                'Referer': 'https://mm.pip.world/',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'privy-app-id': 'cmd5wk49c01qejr0m6tun1ri5',
-                'privy-ca-id': '57e973d5-e48f-4e5f-9f26-0576573aa378',
-                'privy-client': 'react-auth:2.13.7'
-            }
-            response = self.make_intelligent_request('POST', url, wallet_address=address, json={"address": address}, headers=headers, timeout=30, proxy=proxy)
-            if response and response.status_code == 200:
-                return response.json()
-            if response:
-                self.print_color(f"SIWE init failed: {response.status_code}", "yellow")
+    async def verify_token_async(self, token: str, proxy=None, budget=None) -> bool:
+        try:
+            url = f"{API_BASE_URL}/account"
+            headers = {'Accept': 'application/json, text/plain, */*', 'Cookie': f'privy-token={token}'}
+            response = await self.make_intelligent_request_async('GET', url, headers=headers, timeout=10, proxy=proxy, budget=budget)
+            return response is not None and response.status_code == 200
+        except Exception:
+            return False
+    
+    def parse_init_response(self, response):
+        if response and response.status_code == 200:
+            return response.json()
+        if response:
+            self.print_color(f"SIWE init failed: {response.status_code}", "yellow", level="warning")
+        return None
+    
+    def init_siwe(self, address, proxy=None, budget=None):
+        try:
+            url = f"{PRIVY_BASE_URL}/api/v1/siwe/init"
+            response = self.make_intelligent_request('POST', url, wallet_address=address, json={"address": address}, headers=dict(PRIVY_HEADERS), timeout=30, proxy=proxy, budget=budget)
+            return self.parse_init_response(response)
+        except Exception as e:
+            self.print_color(f"Init SIWE error: {e}", "yellow", level="warning")
             return None
+    
+    async def init_siwe_async(self, address, proxy=None, budget=None):
+        try:
+            url = f"{PRIVY_BASE_URL}/api/v1/siwe/init"
+            response = await self.make_intelligent_request_async('POST', url, wallet_address=address, json={"address": address}, headers=dict(PRIVY_HEADERS), timeout=30, proxy=proxy, budget=budget)
+            return self.parse_init_response(response)
         except Exception as e:
-            self.print_color(f"Init SIWE error: {e}", "yellow")
+            self.print_color(f"Init SIWE error: {e}", "yellow", level="warning")
             return None
     
     def create_siwe_message(self, address: str, nonce: str, issued_at: str) -> str:
         return f"mm.pip.world wants you to sign in with your Ethereum account:\n{address}\n\nBy signing, you are proving you own this wallet and logging in. This does not initiate a transaction or cost any fees.\n\nURI: https://mm.pip.world\nVersion: 1\nChain ID: 1\nNonce: {nonce}\nIssued At: {issued_at}\nResources:\n- https://privy.io"
     
+    def build_siwe_message(self, address: str, init_data: Optional[Dict]) -> Optional[str]:
+        if not init_data:
+            return None
+        nonce = init_data.get('nonce')
+        issued_at = init_data.get('issued_at') or init_data.get('expires_at')
+        if not nonce or not issued_at:
+            return None
+        return self.create_siwe_message(address, nonce, issued_at)
+    
     def sign_message(self, private_key: str, message: str) -> Optional[str]:
         try:
-            w3 = Web3()
-            if not private_key.startswith('0x'):
-                private_key = '0x' + private_key
-            if len(private_key) != 66:
-                self.print_color("Invalid private key length", "yellow")
+            account = self.signers.get(private_key)
+            if account is None:
+                self.print_color("Invalid private key", "yellow", level="warning")
                 return None
-            message_hash = encode_defunct(text=message)
-            signed = w3.eth.account.sign_message(message_hash, private_key=private_key)
+            signed = account.sign_message(encode_defunct(text=message))
             return "0x" + signed.signature.hex()
         except Exception as e:
-            self.print_color(f"Sign error: {e}", "yellow")
-            return None
-    
-    def authenticate_siwe(self, address: str, message: str, signature: str, proxy=None):
-        try:
-            url = "https://privy.pip.world/api/v1/siwe/authenticate"
-            headers = {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'Origin': 'https://mm.pip.world',
-                'Referer': 'https://mm.pip.world/',
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'privy-app-id': 'cmd5wk49c01qejr0m6tun1ri5',
-                'privy-ca-id': '57e973d5-e48f-4e5f-9f26-0576573aa378',
-                'privy-client': 'react-auth:2.13.7'
-            }
-            payload = {
-                "chainId": "eip155:1",
-                "connectorType": "injected",
-                "message": message,
-                "mode": "no-signup",
-                "signature": signature,
-                "walletClientType": "rabby_wallet"
-            }
-            response = self.make_intelligent_request('POST', url, wallet_address=address, json=payload, headers=headers, timeout=30, proxy=proxy)
-            if response and response.status_code == 200:
-                data = response.json()
-                token = data.get('token')
-                if token:
-                    return {
-                        'success': True,
-                        'user_id': data.get('user', {}).get('id', ''),
-                        'token': token,
-                        'user_data': data.get('user', {})
-                    }
+            self.print_color(f"Sign error: {e}", "yellow", level="warning")
+            return None
+    
+    def build_auth_payload(self, message: str, signature: str) -> Dict:
+        return {
+            "chainId": "eip155:1",
+            "connectorType": "injected",
+            "message": message,
+            "mode": "no-signup",
+            "signature": signature,
+            "walletClientType": "rabby_wallet"
+        }
+    
+    def parse_auth_response(self, response) -> Optional[Dict]:
+        if response and response.status_code == 200:
+            data = response.json()
+            token = data.get('token')
+            if token:
+                return {
+                    'success': True,
+                    'user_id': data.get('user', {}).get('id', ''),
+                    'token': token,
+                    'user_data': data.get('user', {})
+                }
+        return None
+    
+    def authenticate_siwe(self, address: str, message: str, signature: str, proxy=None, budget=None):
+        try:
+            url = f"{PRIVY_BASE_URL}/api/v1/siwe/authenticate"
+            payload = self.build_auth_payload(message, signature)
+            response = self.make_intelligent_request('POST', url, wallet_address=address, json=payload, headers=dict(PRIVY_HEADERS), timeout=30, proxy=proxy, budget=budget)
+            return self.parse_auth_response(response)
+        except Exception as e:
+            self.print_color(f"Auth error: {e}", "yellow", level="warning")
             return None
+    
+    async def authenticate_siwe_async(self, address: str, message: str, signature: str, proxy=None, budget=None):
+        try:
+            url = f"{PRIVY_BASE_URL}/api/v1/siwe/authenticate"
+            payload = self.build_auth_payload(message, signature)
+            response = await self.make_intelligent_request_async('POST', url, wallet_address=address, json=payload, headers=dict(PRIVY_HEADERS), timeout=30, proxy=proxy, budget=budget)
+            return self.parse_auth_response(response)
         except Exception as e:
-            self.print_color(f"Auth error: {e}", "yellow")
+            self.print_color(f"Auth error: {e}", "yellow", level="warning")
+            return None
+    
+    def parse_tasks_response(self, response, address: str):
+        if response and response.status_code == 200:
+            tasks = response.json()
+            if isinstance(tasks, list):
+                self.task_ledger.observe(address, tasks, response.headers.get('ETag'))
+            return tasks
+        elif response and response.status_code == 304:
+            return self.task_ledger.not_modified(address)
+        elif response is not None and response.status_code == 401:
+            self.print_color("Token expired, needs re-login", "yellow", level="warning")
+            self.token_store.invalidate(address)
+            return None
+        else:
+            if response:
+                self.print_color(f"Failed to get tasks: {response.status_code}", "yellow", level="warning")
             return None
     
-    def get_tasks(self, token: str, address: str, proxy=None):
+    def get_tasks(self, token: str, address: str, proxy=None, budget=None):
+        started = time.monotonic()
         try:
-            url = "https://api-mm.pip.world/xp-tasks"
+            url = f"{API_BASE_URL}/xp-tasks"
             headers = {'Accept': 'application/json, text/plain, */*', 'Cookie': f'privy-token={token}'}
-            response = self.make_intelligent_request('GET', url, wallet_address=address, headers=headers, timeout=30, proxy=proxy)
-            if response and response.status_code == 200:
-                return response.json()
-            elif response and response.status_code == 401:
-                self.print_color("Token expired, needs re-login", "yellow")
-                return None
+            etag = self.task_ledger.etag(address)
+            if etag:
+                headers['If-None-Match'] = etag
+            response = self.make_intelligent_request('GET', url, wallet_address=address, headers=headers, timeout=30, proxy=proxy, budget=budget)
+            tasks = self.parse_tasks_response(response, address)
+            self.record_operation('get_tasks', started, 'ok' if tasks else 'failed')
+            return tasks
+        except Exception as e:
+            self.print_color(f"Error getting tasks: {e}", "yellow", level="warning")
+            self.record_operation('get_tasks', started, 'error')
+            return None
+    
+    async def get_tasks_async(self, token: str, address: str, proxy=None, budget=None):
+        started = time.monotonic()
+        try:
+            url = f"{API_BASE_URL}/xp-tasks"
+            headers = {'Accept': 'application/json, text/plain, */*', 'Cookie': f'privy-token={token}'}
+            etag = self.task_ledger.etag(address)
+            if etag:
+                headers['If-None-Match'] = etag
+            response = await self.make_intelligent_request_async('GET', url, wallet_address=address, headers=headers, timeout=30, proxy=proxy, budget=budget)
+            tasks = self.parse_tasks_response(response, address)
+            self.record_operation('get_tasks', started, 'ok' if tasks else 'failed')
+            return tasks
+        except Exception as e:
+            self.print_color(f"Error getting tasks: {e}", "yellow", level="warning")
+            self.record_operation('get_tasks', started, 'error')
+            return None
+    
+    def parse_claim_response(self, response, address: str, task_id: str):
+        if response and response.status_code == 200:
+            data = response.json()
+            if data.get('success'):
+                self.task_ledger.record_claim(address, task_id, True)
+                return data
             else:
-                if response:
-                    self.print_color(f"Failed to get tasks: {response.status_code}", "yellow")
+                error_msg = data.get('error', 'Unknown error')
+                self.print_color(f"Claim failed: {error_msg}", "yellow", level="warning")
                 return None
+        elif response is not None and response.status_code == 400:
+            self.print_color(f"Already claimed or not eligible", "yellow", level="warning")
+            self.task_ledger.record_claim(address, task_id, False)
+            return None
+        elif response is not None and response.status_code == 401:
+            self.print_color("Token expired, needs re-login", "yellow", level="warning")
+            self.token_store.invalidate(address)
+            return None
+        else:
+            if response:
+                self.print_color(f"Claim failed: {response.status_code}", "yellow", level="warning")
+            return None
+    
+    def claim_task(self, token: str, task_id: str, address: str, task_name: str = "", proxy=None, budget=None):
+        started = time.monotonic()
+        try:
+            url = f"{API_BASE_URL}/xp/tasks/{task_id}"
+            headers = {'Accept': 'application/json, text/plain, */*', 'Content-Type': 'application/json', 'Cookie': f'privy-token={token}'}
+            response = self.make_intelligent_request('POST', url, wallet_address=address, headers=headers, json={}, timeout=30, proxy=proxy, budget=budget)
+            result = self.parse_claim_response(response, address, task_id)
+            self.record_operation('claim_task', started, 'claimed' if result else 'rejected')
+            return result
         except Exception as e:
-            self.print_color(f"Error getting tasks: {e}", "yellow")
+            self.print_color(f"Error claiming: {e}", "yellow", level="warning")
+            self.record_operation('claim_task', started, 'error')
             return None
     
-    def claim_task(self, token: str, task_id: str, address: str, task_name: str = "", proxy=None):
+    async def claim_task_async(self, token: str, task_id: str, address: str, task_name: str = "", proxy=None, budget=None):
+        started = time.monotonic()
         try:
-            url = f"https://api-mm.pip.world/xp/tasks/{task_id}"
+            url = f"{API_BASE_URL}/xp/tasks/{task_id}"
             headers = {'Accept': 'application/json, text/plain, */*', 'Content-Type': 'application/json', 'Cookie': f'privy-token={token}'}
-            response = self.make_intelligent_request('POST', url, wallet_address=address, headers=headers, json={}, timeout=30, proxy=proxy)
-            if response and response.status_code == 200:
-                data = response.json()
-                if data.get('success'):
-                    return data
-                else:
-                    error_msg = data.get('error', 'Unknown error')
-                    self.print_color(f"Claim failed: {error_msg}", "yellow")
-                    return None
-            elif response and response.status_code == 400:
-                self.print_color(f"Already claimed or not eligible", "yellow")
-                return None
-            else:
-                if response:
-                    self.print_color(f"Claim failed: {response.status_code}", "yellow")
-                return None
+            response = await self.make_intelligent_request_async('POST', url, wallet_address=address, headers=headers, json={}, timeout=30, proxy=proxy, budget=budget)
+            result = self.parse_claim_response(response, address, task_id)
+            self.record_operation('claim_task', started, 'claimed' if result else 'rejected')
+            return result
         except Exception as e:
-            self.print_color(f"Error claiming: {e}", "yellow")
+            self.print_color(f"Error claiming: {e}", "yellow", level="warning")
+            self.record_operation('claim_task', started, 'error')
             return None
     
-    def process_wallet_tasks(self, wallet: Dict):
-        address = wallet['address']
-        proxy = wallet.get('proxy')
+    def print_wallet_header(self, wallet: WalletRecord):
+        proxy = wallet.proxy
         self.print_color(f"\n{'='*60}", "cyan")
-        self.print_color(f"PROCESSING WALLET #{wallet['index']}: {address[:10]}...", "cyan")
+        self.print_color(f"PROCESSING WALLET #{wallet.index}: {wallet.address[:10]}...", "cyan")
         if proxy:
             self.print_color(f"Using proxy: {proxy[:50]}...", "blue")
         self.print_color(f"{'='*60}", "cyan")
-        login_result = self.smart_login(wallet)
+    
+    def get_login_token(self, login_result: Optional[Dict]) -> Optional[str]:
         if not login_result:
-            self.print_color("Failed to login, skipping wallet", "red")
-            return False
+            self.print_color("Failed to login, skipping wallet", "red", level="error")
+            return None
         token = login_result.get('token')
         if not token:
-            self.print_color("No token received", "red")
-            return False
-        tasks = None
-        for attempt in range(3):
-            self.print_color(f"Getting tasks (attempt {attempt+1}/3)...", "yellow")
-            tasks = self.get_tasks(token, address, proxy)
-            if tasks:
-                break
-            elif attempt < 2:
-                delay = random.uniform(10, 20)
-                self.print_color(f"Waiting {delay:.1f}s before retry...", "yellow")
-                time.sleep(delay)
-        if not tasks:
-            self.print_color("Failed to get tasks after retries", "red")
-            return False
-        self.print_color(f"Found {len(tasks)} tasks", "green")
-        daily_claimed = False
-        claimed_count = 0
-        total_xp = 0
+            self.print_color("No token received", "red", level="error")
+        return token
+    
+    def split_claimable_tasks(self, tasks: List[Dict], address: str) -> Tuple[List[Tuple], List[Tuple]]:
+        """Returns (daily, extras): daily check-in diklaim di phase 1, sisanya di phase 2"""
+        daily, extras = [], []
+        settled = 0
         for task in tasks:
             task_id = task.get('id')
             task_name = task.get('name', 'Unknown Task')
-            task_xp = task.get('xp', 0)
-            is_done = task.get('done', False)
-            if is_done:
+            if task.get('done', False):
                 continue
             if task_id in self.SKIP_TASKS:
                 self.print_color(f"Skipping: {task_name}", "blue")
                 continue
-            self.print_color(f"Attempting: {task_name} (+{task_xp} XP)", "cyan")
-            claim_result = self.claim_task(token, task_id, address, task_name, proxy)
-            if claim_result and claim_result.get('success'):
-                earned_xp = claim_result.get('xp', task_xp)
-                self.print_color(f"Claimed! +{earned_xp} XP", "green")
-                claimed_count += 1
-                total_xp += earned_xp
-                delay = random.uniform(1, 3)
-                time.sleep(delay)
-                if task_id == "h8i9j0k1-l2m3-n4o5-p6q7-r8s9t0u1v2w3":
-                    daily_claimed = True
-            else:
-                self.print_color("Could not claim", "yellow")
+            if self.task_ledger.is_settled(address, task_id):
+                settled += 1
+                continue
+            entry = (task_id, task_name, task.get('xp', 0))
+            (daily if task_id in self.AUTO_CLAIMABLE_TASKS else extras).append(entry)
+        if settled:
+            self.print_color(f"Skipping {settled} tasks already done or ineligible (ledger)", "blue")
+        return daily, extras
+    
+    def print_wallet_summary(self, wallet: WalletRecord, claimed_count: int, total_xp: int, daily_claimed: bool, budget: Optional[RetryBudget] = None):
         self.print_color(f"\n{'='*60}", "green")
-        self.print_color(f"WALLET #{wallet['index']} SUMMARY:", "green")
+        self.print_color(f"WALLET #{wallet.index} SUMMARY:", "green")
         self.print_color(f"Tasks claimed: {claimed_count}", "green")
         self.print_color(f"Total XP earned: {total_xp}", "green")
-        self.print_color(f"Daily check-in: {'✓' if daily_claimed else '✗'}", "green" if daily_claimed else "red")
+        self.print_color(f"Daily check-in: {'✓' if daily_claimed else '✗'}", "green" if daily_claimed else "red", level="info" if daily_claimed else "warning")
+        if budget:
+            self.print_color(f"Budget used: {budget.summary()}", "blue")
         self.print_color(f"{'='*60}", "green")
-        return daily_claimed
+    
+    def record_claim(self, progress: Dict, task_id: str, task_xp: int, claim_result: Optional[Dict]) -> bool:
+        if not (claim_result and claim_result.get('success')):
+            self.print_color("Could not claim", "yellow", level="warning")
+            return False
+        earned_xp = claim_result.get('xp', task_xp)
+        self.print_color(f"Claimed! +{earned_xp} XP", "green")
+        progress['claimed'] += 1
+        progress['xp'] += earned_xp
+        self.cycle_stats.update(claimed=1, xp=earned_xp)
+        if task_id in self.AUTO_CLAIMABLE_TASKS:
+            progress['daily'] = True
+        return True
+    
+    def claim_tasks(self, token: str, wallet: WalletRecord, queue: List[Tuple], progress: Dict, budget: RetryBudget):
+        while queue:
+            if self.budget_exhausted(budget):
+                break
+            task_id, task_name, task_xp = queue[0]
+            self.print_color(f"Attempting: {task_name} (+{task_xp} XP)", "cyan")
+            with self.span(wallet, 'claims', budget):
+                claim_result = self.claim_task(token, task_id, wallet.address, task_name, wallet.proxy, budget)
+            queue.pop(0)
+            if self.record_claim(progress, task_id, task_xp, claim_result):
+                with self.span(wallet, 'sleep'):
+                    self.backoff_sleep(random.uniform(1, 3), budget)
+    
+    async def claim_tasks_async(self, token: str, wallet: WalletRecord, queue: List[Tuple], progress: Dict, budget: RetryBudget):
+        while queue:
+            if self.budget_exhausted(budget):
+                break
+            task_id, task_name, task_xp = queue[0]
+            self.print_color(f"Attempting: {task_name} (+{task_xp} XP)", "cyan")
+            with self.span(wallet, 'claims', budget):
+                claim_result = await self.claim_task_async(token, task_id, wallet.address, task_name, wallet.proxy, budget)
+            queue.pop(0)
+            if self.record_claim(progress, task_id, task_xp, claim_result):
+                with self.span(wallet, 'sleep'):
+                    await self.backoff_sleep_async(random.uniform(1, 3), budget)
+    
+    def fetch_wallet_tasks(self, wallet: WalletRecord, budget: RetryBudget) -> Tuple[Optional[str], Optional[List[Dict]]]:
+        with self.span(wallet, 'login', budget):
+            login_result = self.smart_login(wallet, budget)
+        token = self.get_login_token(login_result)
+        if not token:
+            return None, None
+        tasks = self.task_ledger.cached_tasks(wallet.address)
+        if tasks:
+            self.print_color("Task list unchanged, using ledger snapshot", "blue")
+            self.metrics.inc('pipworld_task_operations_total', operation='get_tasks', result='cached')
+            return token, tasks
+        while budget.task_fetches < 3:
+            if self.budget_exhausted(budget):
+                break
+            budget.task_fetches += 1
+            self.print_color(f"Getting tasks (attempt {budget.task_fetches}/3)...", "yellow")
+            with self.span(wallet, 'fetch', budget):
+                tasks = self.get_tasks(token, wallet.address, wallet.proxy, budget)
+            if tasks:
+                break
+            elif budget.task_fetches < 3:
+                delay = random.uniform(10, 20)
+                self.print_color(f"Retrying tasks in {delay:.1f}s...", "yellow", level="warning")
+                with self.span(wallet, 'sleep'):
+                    self.defer_or_sleep(delay, budget, "task fetch retry")
+        if not tasks:
+            self.print_color("Failed to get tasks after retries", "red", level="error")
+        return token, tasks
+    
+    async def fetch_wallet_tasks_async(self, wallet: WalletRecord, budget: RetryBudget) -> Tuple[Optional[str], Optional[List[Dict]]]:
+        with self.span(wallet, 'login', budget):
+            login_result = await self.smart_login_async(wallet, budget)
+        token = self.get_login_token(login_result)
+        if not token:
+            return None, None
+        tasks = self.task_ledger.cached_tasks(wallet.address)
+        if tasks:
+            self.print_color("Task list unchanged, using ledger snapshot", "blue")
+            self.metrics.inc('pipworld_task_operations_total', operation='get_tasks', result='cached')
+            return token, tasks
+        while budget.task_fetches < 3:
+            if self.budget_exhausted(budget):
+                break
+            budget.task_fetches += 1
+            self.print_color(f"Getting tasks (attempt {budget.task_fetches}/3)...", "yellow")
+            with self.span(wallet, 'fetch', budget):
+                tasks = await self.get_tasks_async(token, wallet.address, wallet.proxy, budget)
+            if tasks:
+                break
+            elif budget.task_fetches < 3:
+                delay = random.uniform(10, 20)
+                self.print_color(f"Retrying tasks in {delay:.1f}s...", "yellow", level="warning")
+                with self.span(wallet, 'sleep'):
+                    await self.defer_or_sleep_async(delay, budget, "task fetch retry")
+        if not tasks:
+            self.print_color("Failed to get tasks after retries", "red", level="error")
+        return token, tasks
+    
+    def start_wallet_tasks(self, wallet: WalletRecord, token: str, tasks: List[Dict]) -> Tuple[List[Tuple], Dict]:
+        self.print_color(f"Found {len(tasks)} tasks", "green")
+        daily, extras = self.split_claimable_tasks(tasks, wallet.address)
+        claimed_today = any(self.task_ledger.state(wallet.address, task_id) == 'daily' for task_id in self.AUTO_CLAIMABLE_TASKS)
+        progress = {'token': token, 'extras': extras, 'claimed': 0, 'xp': 0, 'daily': claimed_today, 'recorded': (0, 0)}
+        return daily, progress
+    
+    def finish_daily_phase(self, wallet: WalletRecord, progress: Dict, budget: RetryBudget) -> Dict:
+        if progress['extras']:
+            self.pending_extras[wallet.address.lower()] = progress
+            self.print_color(f"Daily check-in: {'✓' if progress['daily'] else '✗'}; {len(progress['extras'])} tasks queued for phase 2", "green" if progress['daily'] else "red", level="info" if progress['daily'] else "warning")
+        else:
+            self.print_wallet_summary(wallet, progress['claimed'], progress['xp'], progress['daily'], budget)
+        return progress
+    
+    def process_wallet_tasks(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        self.print_wallet_header(wallet)
+        budget = budget or RetryBudget(self.wallet_deadline, self.wallet_max_requests)
+        token, tasks = self.fetch_wallet_tasks(wallet, budget)
+        if not tasks:
+            self.print_color(f"Budget used: {budget.summary()}", "blue")
+            self.cycle_stats['failed'] += 1
+            return None
+        daily, progress = self.start_wallet_tasks(wallet, token, tasks)
+        self.claim_tasks(token, wallet, daily, progress, budget)
+        return self.finish_daily_phase(wallet, progress, budget)
+    
+    async def process_wallet_tasks_async(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        self.print_wallet_header(wallet)
+        budget = budget or RetryBudget(self.wallet_deadline, self.wallet_max_requests)
+        token, tasks = await self.fetch_wallet_tasks_async(wallet, budget)
+        if not tasks:
+            self.print_color(f"Budget used: {budget.summary()}", "blue")
+            self.cycle_stats['failed'] += 1
+            return None
+        daily, progress = self.start_wallet_tasks(wallet, token, tasks)
+        await self.claim_tasks_async(token, wallet, daily, progress, budget)
+        return self.finish_daily_phase(wallet, progress, budget)
+    
+    def process_wallet_extras(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        budget = budget or RetryBudget(self.wallet_deadline, self.wallet_max_requests)
+        progress = self.pending_extras.get(wallet.address.lower())
+        if progress is None:
+            self.print_wallet_header(wallet)
+            token, tasks = self.fetch_wallet_tasks(wallet, budget)
+            if not tasks:
+                return None
+            _, progress = self.start_wallet_tasks(wallet, token, tasks)
+            self.pending_extras[wallet.address.lower()] = progress
+        else:
+            self.print_color(f"\nPHASE 2 WALLET #{wallet.index}: {wallet.address[:10]}... ({len(progress['extras'])} tasks)", "cyan")
+        self.claim_tasks(progress['token'], wallet, progress['extras'], progress, budget)
+        del self.pending_extras[wallet.address.lower()]
+        self.print_wallet_summary(wallet, progress['claimed'], progress['xp'], bool(self.journal.finished.get(wallet.address.lower())), budget)
+        return progress
+    
+    async def process_wallet_extras_async(self, wallet: WalletRecord, budget: Optional[RetryBudget] = None) -> Optional[Dict]:
+        budget = budget or RetryBudget(self.wallet_deadline, self.wallet_max_requests)
+        progress = self.pending_extras.get(wallet.address.lower())
+        if progress is None:
+            self.print_wallet_header(wallet)
+            token, tasks = await self.fetch_wallet_tasks_async(wallet, budget)
+            if not tasks:
+                return None
+            _, progress = self.start_wallet_tasks(wallet, token, tasks)
+            self.pending_extras[wallet.address.lower()] = progress
+        else:
+            self.print_color(f"\nPHASE 2 WALLET #{wallet.index}: {wallet.address[:10]}... ({len(progress['extras'])} tasks)", "cyan")
+        await self.claim_tasks_async(progress['token'], wallet, progress['extras'], progress, budget)
+        del self.pending_extras[wallet.address.lower()]
+        self.print_wallet_summary(wallet, progress['claimed'], progress['xp'], bool(self.journal.finished.get(wallet.address.lower())), budget)
+        return progress
+    
+    def span(self, wallet: WalletRecord, kind: str, budget: Optional[RetryBudget] = None):
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.span(wallet.address, kind, budget)
+    
+    def record_phase(self, phase: int, wallet: WalletRecord, progress: Optional[Dict], budget: RetryBudget) -> bool:
+        self.record_result(wallet, progress, budget)
+        if phase == 2:
+            self.journal.record_extras(wallet.address)
+            return progress is not None
+        success = bool(progress and progress['daily'])
+        self.journal.record_wallet(wallet.address, success)
+        if wallet.address.lower() not in self.pending_extras:
+            self.journal.record_extras(wallet.address)
+        return success
+    
+    def record_result(self, wallet: WalletRecord, progress: Optional[Dict], budget: RetryBudget):
+        claimed = xp = 0
+        if progress:
+            claimed = progress['claimed'] - progress['recorded'][0]
+            xp = progress['xp'] - progress['recorded'][1]
+            progress['recorded'] = (progress['claimed'], progress['xp'])
+        self.results.record(
+            self.journal.cycle, wallet.address, bool(progress and progress['daily']), claimed, xp,
+            progress is None, budget.elapsed(), budget.attempts
+        )
+    
+    def build_scheduler(self, phase: int = 1) -> BackoffScheduler:
+        scheduler = BackoffScheduler()
+        for wallet in self.wallets:
+            if self.journal.is_finished(wallet.address, phase):
+                continue
+            if phase == 2 and not self.journal.is_finished(wallet.address):
+                continue
+            scheduler.push((wallet, RetryBudget(self.wallet_deadline, self.wallet_max_requests, self.max_deferrals)))
+        return scheduler
+    
+    def park_wallet(self, scheduler: BackoffScheduler, wallet: WalletRecord, budget: RetryBudget, deferred: WalletDeferred):
+        budget.park()
+        scheduler.push((wallet, budget), deferred.delay * self.pacing)
+        self.metrics.inc('pipworld_wallet_deferrals_total')
+        self.print_color(f"Parked wallet #{wallet.index} for {deferred.delay:.0f}s ({deferred.reason}); {scheduler.describe()}", "blue")
+    
+    def announce_phase(self, phase: int, scheduler: BackoffScheduler):
+        if phase == 1:
+            self.print_color(f"Phase 1: daily check-in for {len(scheduler)} wallets", "purple")
+        elif len(scheduler):
+            self.print_color(f"Phase 2: remaining tasks for {len(scheduler)} wallets", "purple")
+    
+    def run_cycle(self) -> int:
+        self.pending_extras.clear()
+        daily_success_count = self.run_phase(1)
+        if not self.stopping:
+            self.run_phase(2)
+        return daily_success_count
+    
+    def run_phase(self, phase: int) -> int:
+        process = self.process_wallet_tasks if phase == 1 else self.process_wallet_extras
+        success_count = 0
+        scheduler = self.build_scheduler(phase)
+        self.announce_phase(phase, scheduler)
+        while len(scheduler):
+            if self.stopping:
+                self.print_color(f"Draining: {len(scheduler)} wallets left for the next start", "yellow")
+                break
+            item = scheduler.pop_ready()
+            if item is None:
+                wait = scheduler.next_wake()
+                self.print_color(f"All pending wallets parked, sleeping {wait:.0f}s; {scheduler.describe()}", "blue")
+                if self.daemon:
+                    self.wake.wait(wait)
+                    self.wake.clear()
+                else:
+                    time.sleep(wait)
+                continue
+            wallet, budget = item
+            budget.resume()
+            try:
+                success = self.record_phase(phase, wallet, process(wallet, budget), budget)
+                if success:
+                    success_count += 1
+                if len(scheduler) and not self.stopping:
+                    delay = random.uniform(5, 15)
+                    self.print_color(f"Next wallet in {delay:.1f}s...", "blue")
+                    with self.span(wallet, 'sleep'):
+                        time.sleep(delay * self.pacing)
+            except WalletDeferred as deferred:
+                self.park_wallet(scheduler, wallet, budget, deferred)
+            except Exception as e:
+                self.print_color(f"Error processing wallet: {e}", "red", level="error")
+                self.cycle_stats['failed'] += 1
+                self.record_result(wallet, None, budget)
+                continue
+        return success_count
+    
+    def wallets_needing_login(self) -> List[WalletRecord]:
+        wallets = []
+        for wallet in self.wallets:
+            if self.journal.is_finished(wallet.address):
+                continue
+            token, needs_verify = self.token_store.lookup(wallet.address)
+            if token and not needs_verify:
+                continue
+            should_retry, wait_time = self.session_manager.should_retry_login(wallet.address)
+            if should_retry and wait_time == 0:
+                wallets.append(wallet)
+        return wallets
+    
+    async def prelogin_async(self):
+        wallets = self.wallets_needing_login()
+        if not wallets:
+            return
+        self.print_color(f"Pipelined login for {len(wallets)} wallets...", "cyan")
+        started = time.monotonic()
+        pipeline = LoginPipeline(self, self.concurrency)
+        await pipeline.run(wallets)
+        self.print_color(f"Pipelined login done in {time.monotonic() - started:.1f}s: {pipeline.describe()}", "cyan")
+    
+    async def run_cycle_async(self) -> int:
+        load_async_deps()
+        changed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        def on_stop():
+            self.stopping = True
+            changed.set()
+        if self.drain_on_signal:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(signum, on_stop)
+        self.pending_extras.clear()
+        try:
+            try:
+                await self.prelogin_async()
+            except Exception as e:
+                self.print_color(f"Pipelined login error: {e}", "yellow", level="warning")
+            daily_success_count = await self.run_phase_async(1, changed)
+            if not self.stopping:
+                await self.run_phase_async(2, changed)
+        finally:
+            if self.drain_on_signal:
+                for signum in (signal.SIGTERM, signal.SIGINT):
+                    loop.remove_signal_handler(signum)
+                self.install_signal_handlers()
+            await self.close_async_sessions()
+        return daily_success_count
+    
+    async def run_phase_async(self, phase: int, changed: 'asyncio.Event') -> int:
+        process = self.process_wallet_tasks_async if phase == 1 else self.process_wallet_extras_async
+        scheduler = self.build_scheduler(phase)
+        self.announce_phase(phase, scheduler)
+        in_flight = 0
+        outcomes = []
+        async def worker():
+            nonlocal in_flight
+            while (len(scheduler) or in_flight) and not self.stopping:
+                item = scheduler.pop_ready()
+                if item is None:
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=scheduler.next_wake())
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                wallet, budget = item
+                budget.resume()
+                in_flight += 1
+                try:
+                    success = self.record_phase(phase, wallet, await process(wallet, budget), budget)
+                    outcomes.append(success)
+                except WalletDeferred as deferred:
+                    self.park_wallet(scheduler, wallet, budget, deferred)
+                    continue
+                except Exception as e:
+                    self.print_color(f"Error processing wallet: {e}", "red", level="error")
+                    self.cycle_stats['failed'] += 1
+                    self.record_result(wallet, None, budget)
+                    outcomes.append(False)
+                finally:
+                    in_flight -= 1
+                    changed.set()
+                if len(scheduler) and not self.stopping:
+                    delay = random.uniform(5, 15)
+                    self.print_color(f"Next wallet in {delay:.1f}s...", "blue")
+                    with self.span(wallet, 'sleep'):
+                        await asyncio.sleep(delay * self.pacing)
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(scheduler)))))
+        if self.stopping and len(scheduler):
+            self.print_color(f"Draining: {len(scheduler)} wallets left for the next start", "yellow")
+        return sum(1 for success in outcomes if success)
+    
+    def run_sharded_cycle(self, cycle: int) -> int:
+        options = dict(self.options, concurrency=max(1, self.concurrency // self.shards), host_rates=self.rate_limiter.split(self.shards))
+        context = multiprocessing.get_context('spawn')
+        results = context.SimpleQueue()
+        self.shard_processes = [
+            context.Process(target=run_shard, args=(options, index, self.shards, cycle, results), name=f'shard-{index}')
+            for index in range(self.shards)
+        ]
+        try:
+            for process in self.shard_processes:
+                process.start()
+            for process in self.shard_processes:
+                process.join()
+        finally:
+            crashed = sum(1 for process in self.shard_processes if process.exitcode != 0)
+            self.shard_processes = []
+        while not results.empty():
+            stats, snapshot = results.get()
+            self.cycle_stats.update(stats)
+            self.metrics.merge(snapshot)
+        if crashed:
+            self.print_color(f"{crashed} shard processes exited with an error", "red", level="error")
+        self.journal.load(cycle)
+        return self.journal.daily_success(self.wallets)
+    
+    def record_cycle(self, started: float, daily_success_count: int, total_wallets: int):
+        self.metrics.inc('pipworld_cycles_total')
+        self.metrics.set('pipworld_cycle_duration_seconds', time.monotonic() - started)
+        self.metrics.set('pipworld_cycle_wallets', total_wallets)
+        self.metrics.set('pipworld_cycle_daily_success_ratio', daily_success_count / total_wallets if total_wallets else 0)
+        self.metrics.set('pipworld_cycle_failed_wallets', self.cycle_stats['failed'])
     
     def run_continuous(self):
-        print("\033c")
+        if self.daemon:
+            self.install_signal_handlers()
+        else:
+            print("\033c")
         self.print_color("="*80, "cyan")
         self.print_color("PIP.WORLD AUTO TASK BOT AND CEKIN DAILY - BACTIAR291", "cyan")
         self.print_color("="*80, "cyan")
         if not self.load_wallets_and_proxies():
             return
         if not self.wallets:
-            self.print_color("No valid wallets found", "red")
+            self.print_color("No valid wallets found", "red", level="error")
             return
         self.print_color("CONFIGURATION:", "yellow")
         self.print_color(f"Total wallets: {len(self.wallets)}", "yellow")
         self.print_color("Session manager: Active", "yellow")
         self.print_color("Smart requests: Enabled", "yellow")
-        input("Press Enter to start automation...")
-        cycle = 1
+        if self.use_async:
+            self.print_color(f"Engine: asyncio (concurrency {self.concurrency})", "yellow")
+        else:
+            self.print_color("Engine: sequential", "yellow")
+        if self.shards > 1:
+            self.print_color(f"Shards: {self.shards} worker processes", "yellow")
+        if self.metrics_port:
+            self.metrics.serve(self.metrics_port)
+            self.print_color(f"Metrics: http://127.0.0.1:{self.metrics_port}/metrics", "yellow")
+        if self.daemon:
+            self.emit_status('started', wallets=len(self.wallets), engine='asyncio' if self.use_async else 'sequential', pid=os.getpid())
+        else:
+            self.logger.flush()
+            input("Press Enter to start automation...")
+        cycle, next_run = self.journal.resume()
+        if next_run is not None:
+            if next_run > time.time():
+                self.print_color(f"Cycle #{cycle} already complete, resuming schedule", "cyan")
+                self.wait_for_next_cycle(datetime.fromtimestamp(next_run))
+            if not self.stopping:
+                cycle += 1
+        elif cycle:
+            self.journal.begin(cycle)
+            self.print_color(f"Resuming cycle #{cycle}: {len(self.journal.finished)} wallets already finished", "cyan")
+        else:
+            cycle = 1
         successful_cycles = 0
-        while True:
+        while not self.stopping:
             try:
+                self.journal.begin(cycle)
+                if self.daemon:
+                    self.emit_status('cycle_start', cycle=cycle, wallets=len(self.wallets))
                 self.print_color(f"\n{'='*80}", "purple")
                 self.print_color(f"CYCLE #{cycle} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", "purple")
                 self.print_color(f"{'='*80}", "purple")
-                daily_success_count = 0
                 total_wallets = len(self.wallets)
-                for wallet in self.wallets:
-                    try:
-                        success = self.process_wallet_tasks(wallet)
-                        if success:
-                            daily_success_count += 1
-                        if wallet['index'] < total_wallets:
-                            delay = random.uniform(5, 15)
-                            self.print_color(f"Next wallet in {delay:.1f}s...", "blue")
-                            time.sleep(delay)
-                    except Exception as e:
-                        self.print_color(f"Error processing wallet: {e}", "red")
-                        continue
+                self.token_store.purge_expired()
+                self.cycle_stats = Counter()
+                cycle_started = time.monotonic()
+                if self.profiler and self.shards == 1:
+                    self.profiler.start_cycle(cycle)
+                if self.shards > 1:
+                    daily_success_count = self.run_sharded_cycle(cycle)
+                elif self.use_async:
+                    asyncio.run(self.run_cycle_async())
+                    daily_success_count = self.journal.daily_success(self.wallets)
+                else:
+                    self.run_cycle()
+                    daily_success_count = self.journal.daily_success(self.wallets)
+                profile_summary = self.profiler.finish_cycle() if self.profiler else None
+                if profile_summary:
+                    self.print_color(f"Profile written to {profile_summary}", "cyan")
+                if self.stopping:
+                    break
+                self.record_cycle(cycle_started, daily_success_count, total_wallets)
                 self.print_color(f"\n{'='*80}", "green")
                 self.print_color(f"CYCLE #{cycle} COMPLETE:", "green")
-                self.print_color(f"Successful daily check-ins: {daily_success_count}/{total_wallets}", "green" if daily_success_count == total_wallets else "yellow")
+                self.print_color(f"Successful daily check-ins: {daily_success_count}/{total_wallets}", "green" if daily_success_count == total_wallets else "yellow", level="info" if daily_success_count == total_wallets else "warning")
+                if self.cassette:
+                    self.print_color(f"Cassette: {self.cassette.describe()}", "cyan")
+                self.print_color(f"Tasks claimed: {self.cycle_stats['claimed']} (+{self.cycle_stats['xp']} XP), failed wallets: {self.cycle_stats['failed']}", "green")
+                if self.shards == 1:
+                    if not self.use_async:
+                        self.print_color(f"Connection pools: {self.transport.describe()}", "cyan")
+                    self.print_color(f"Request state: {self.request_manager.describe()}", "cyan")
+                    self.print_color(f"Rate limiter: {self.rate_limiter.describe()}", "cyan")
+                    self.print_color(f"Task ledger: {self.task_ledger.describe()}", "cyan")
                 self.print_color("Next cycle in ~24 hours", "cyan")
                 self.print_color(f"{'='*80}", "green")
                 if daily_success_count == total_wallets:
                     successful_cycles += 1
                 next_run = datetime.now() + timedelta(hours=24, minutes=random.randint(1, 30))
-                self.countdown_timer(next_run, "Next cycle at")
+                self.journal.finish(next_run.timestamp())
+                if self.daemon:
+                    self.emit_status('cycle_complete', cycle=cycle, daily_success=daily_success_count, wallets=total_wallets, claimed=self.cycle_stats['claimed'], xp=self.cycle_stats['xp'], failed=self.cycle_stats['failed'], next_run=next_run.isoformat(timespec='seconds'))
+                if self.cassette and self.cassette.mode == 'replay':
+                    self.print_color("Replay finished, live state in pipworld.db was not touched", "cyan")
+                    break
+                if self.reload_requested:
+                    self.reload_wallets()
+                self.wait_for_next_cycle(next_run)
+                if self.stopping:
+                    break
                 cycle += 1
             except KeyboardInterrupt:
                 self.print_color("\n\nBot stopped by user", "yellow")
                 break
             except Exception as e:
-                self.print_color(f"Cycle error: {e}", "red")
-                self.print_color("Retrying in 5 minutes...", "yellow")
-                time.sleep(300)
+                self.print_color(f"Cycle error: {e}", "red", level="error")
+                self.print_color("Retrying in 5 minutes...", "yellow", level="warning")
+                if self.daemon:
+                    self.wait_until(datetime.now() + timedelta(minutes=5))
+                else:
+                    time.sleep(300)
+        if self.daemon:
+            self.emit_status('stopped', cycle=cycle)
     
     def countdown_timer(self, target_time: datetime, message: str = "Next check"):
+        self.logger.flush()
         while datetime.now() < target_time:
             remaining = (target_time - datetime.now()).total_seconds()
             hours = int(remaining // 3600)
@@ -690,40 +3302,135 @@ class PipWorldAutoTask:
             time.sleep(1)
         print()
     
-def create_wallet_file():
+def run_shard(options: Dict, index: int, count: int, cycle: int, results):
+    """Entry point proses shard: jalankan satu cycle untuk wallet milik shard ini"""
+    for key in ('record', 'replay'):
+        if options.get(key):
+            options[key] = f"{options[key]}.shard{index}"
+    if options.get('profile_dir'):
+        options['profile_dir'] = os.path.join(options['profile_dir'], f"shard-{index}")
+    bot = PipWorldAutoTask(**options)
+    bot.shard = (index, count)
+    bot.logger.context['shard'] = index
+    bot.drain_on_signal = True
+    bot.install_signal_handlers()
+    try:
+        if bot.load_wallets_and_proxies():
+            bot.wallets = [wallet for wallet in bot.wallets if shard_of(wallet.address, count) == index]
+            bot.journal.begin(cycle)
+            if bot.profiler:
+                bot.profiler.start_cycle(cycle)
+            if bot.use_async:
+                asyncio.run(bot.run_cycle_async())
+            else:
+                bot.run_cycle()
+    finally:
+        if bot.profiler:
+            bot.profiler.finish_cycle()
+        bot.state_store.close()
+    results.put((dict(bot.cycle_stats), bot.metrics.snapshot()))
+
+def create_wallet_file(stream=None):
+    """stream=sys.stderr di --daemon supaya stdout tetap JSON lines saja"""
     sample_content = "0xYOUR_ADDRESS_HERE,YOUR_PRIVATE_KEY_HERE\n"
     if not os.path.exists('wallets.txt'):
         with open('wallets.txt', 'w', encoding='utf-8') as f:
             f.write(sample_content)
-        print("File wallets.txt telah dibuat (edit dengan format: address,private_key[,proxy_url])")
+        print("File wallets.txt telah dibuat (edit dengan format: address,private_key[,proxy_url])", file=stream)
         return False
     with open('wallets.txt', 'r', encoding='utf-8') as f:
         content = f.read()
         if 'YOUR_ADDRESS_HERE' in content or 'YOUR_PRIVATE_KEY_HERE' in content:
-            print("File wallets.txt masih berisi contoh. Harap edit file dengan data wallet Anda.")
+            print("File wallets.txt masih berisi contoh. Harap edit file dengan data wallet Anda.", file=stream)
             return False
     return True
 
+def print_report(cycles: int = 30, top: int = 10, path: str = 'pipworld.db'):
+    if not os.path.exists(path):
+        print(f"Belum ada {path}, jalankan bot minimal satu cycle dulu")
+        return
+    store = StateStore(path)
+    results = ResultStore(store)
+    rows = results.per_cycle(cycles)
+    if not rows:
+        print("Belum ada hasil cycle yang tersimpan")
+        store.close()
+        return
+    print(f"XP OVER TIME (last {len(rows)} cycles)")
+    print(f"{'cycle':>6} {'date':<16} {'wallets':>7} {'daily':>7} {'claimed':>8} {'XP':>8} {'failed':>6} {'avg s':>7}")
+    total_xp = 0
+    for cycle, at, wallets, daily, claimed, xp, failed, seconds in rows:
+        total_xp += xp
+        print(f"{cycle:>6} {datetime.fromtimestamp(at).strftime('%Y-%m-%d %H:%M'):<16} {wallets:>7} {daily:>7} {claimed:>8} {xp:>8} {failed:>6} {seconds:>7.1f}")
+    print(f"Total XP: {total_xp}")
+    streaks, on_streak, wallets = results.streaks(top)
+    print(f"\nCHECK-IN STREAKS: {on_streak}/{wallets} wallets checked in on the latest cycle")
+    for address, streak in streaks:
+        print(f"  {address[:12]}...  {streak} cycles")
+    print(f"\nSLOWEST WALLETS (last {cycles} cycles)")
+    for address, avg_seconds, max_seconds, avg_requests, count in results.slowest(cycles, top):
+        print(f"  {address[:12]}...  avg {avg_seconds:.1f}s, max {max_seconds:.1f}s, {avg_requests:.1f} requests/cycle over {count} cycles")
+    failing = results.failing(cycles, top)
+    print(f"\nFAILING WALLETS (last {cycles} cycles)")
+    if not failing:
+        print("  none")
+    for address, missed, failed, count, last_missed in failing:
+        print(f"  {address[:12]}...  missed {missed}/{count} check-ins, {failed} failed logins/fetches, last miss cycle #{last_missed}")
+    store.close()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PIP.WORLD auto task bot")
+    parser.add_argument('--async', dest='use_async', action='store_true', help="proses wallet secara concurrent dengan asyncio")
+    parser.add_argument('--concurrency', type=int, default=10, help="jumlah wallet yang diproses bersamaan (mode --async)")
+    parser.add_argument('--wallet-timeout', type=float, default=900, help="batas waktu (detik) untuk satu wallet, termasuk semua retry")
+    parser.add_argument('--wallet-max-requests', type=int, default=60, help="batas jumlah request untuk satu wallet")
+    parser.add_argument('--shards', type=int, default=1, help="bagi wallet ke N proses worker (concurrency dan rate limit dibagi rata)")
+    parser.add_argument('--metrics-port', type=int, default=0, help="expose metrics format Prometheus di http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--log-level', choices=sorted(Logger.LEVELS, key=Logger.LEVELS.get), default='info', help="level log minimum")
+    parser.add_argument('--log-file', help="tulis juga semua log sebagai JSON lines ke file ini")
+    parser.add_argument('--ineligible-ttl', type=float, default=72, help="jam sebelum task yang ditolak (400) dicoba lagi")
+    parser.add_argument('--refresh-window', type=float, default=7200, help="detik sebelum cycle berikutnya untuk re-login token yang akan expired (0 = nonaktif)")
+    parser.add_argument('--record', metavar='FILE', help="rekam semua response HTTP ke cassette (.jsonl.gz); berisi token, simpan dengan aman")
+    parser.add_argument('--replay', metavar='FILE', help="putar ulang cassette hasil --record tanpa menyentuh API live")
+    parser.add_argument('--replay-speed', type=float, default=1.0, help="1 = timing asli, 0 = secepat mungkin (juga men-skala delay antar wallet)")
+    parser.add_argument('--daemon', action='store_true', help="mode non-interaktif untuk supervisor: tanpa prompt/countdown, output JSON lines, SIGHUP reload wallets, SIGTERM drain")
+    parser.add_argument('--profile', metavar='DIR', help="profiling per cycle (cProfile, tracemalloc, span per wallet) ditulis ke DIR/summary.txt")
+    parser.add_argument('--report', action='store_true', help="tampilkan laporan dari hasil cycle yang tersimpan (XP, streak, wallet paling lambat/gagal) lalu keluar")
+    parser.add_argument('--report-cycles', type=int, default=30, help="jumlah cycle terakhir yang dihitung di --report")
+    parser.add_argument('--report-top', type=int, default=10, help="jumlah wallet per daftar di --report")
+    parser.add_argument('--rate', action='append', default=[], metavar='HOST=RPS[/BURST]', help="rate limit per host, contoh: api-mm.pip.world=5/10")
+    return parser.parse_args(argv)
+
 def main():
-    print("\033c")
-    print("PIP.WORLD AUTO BOT")
-    print("="*50)
-    try:
-        from web3 import Web3
-        from eth_account.messages import encode_defunct
-    except ImportError:
-        print("Missing dependencies! Install dengan: pip install web3 requests")
+    args = parse_args()
+    if args.report:
+        print_report(args.report_cycles, args.report_top)
+        return
+    stream = sys.stderr if args.daemon else sys.stdout
+    if not args.daemon:
+        print("\033c")
+        print("PIP.WORLD AUTO BOT")
+        print("="*50)
+    if importlib.util.find_spec('eth_account') is None:
+        print("Missing dependencies! Install dengan: pip install -r requirements.txt", file=stream)
+        return
+    if args.use_async and importlib.util.find_spec('aiohttp') is None:
+        print("Mode --async butuh aiohttp! Install dengan: pip install aiohttp", file=stream)
         return
-    os.makedirs('tokens', exist_ok=True)
-    if not create_wallet_file():
+    if not create_wallet_file(stream):
         return
-    bot = PipWorldAutoTask()
+    host_rates = {} if args.replay else dict(DEFAULT_HOST_RATES)
+    for spec in args.rate:
+        host, _, value = spec.partition('=')
+        per_second, _, burst = value.partition('/')
+        host_rates[host] = (float(per_second), float(burst or per_second))
+    bot = PipWorldAutoTask(use_async=args.use_async, concurrency=args.concurrency, wallet_deadline=args.wallet_timeout, wallet_max_requests=args.wallet_max_requests, host_rates=host_rates, daemon=args.daemon, shards=args.shards, metrics_port=args.metrics_port, log_level=args.log_level, log_file=args.log_file, record=args.record, replay=args.replay, replay_speed=args.replay_speed, refresh_window=args.refresh_window, ineligible_ttl=args.ineligible_ttl * 3600, profile_dir=args.profile)
     try:
         bot.run_continuous()
     except KeyboardInterrupt:
-        bot.print_color("\n\nBot stopped by user", "red")
+        bot.print_color("\n\nBot stopped by user", "red", level="info")
     except Exception as e:
-        bot.print_color(f"Fatal error: {e}", "red")
+        bot.print_color(f"Fatal error: {e}", "red", level="error")
         import traceback
         traceback.print_exc()
 